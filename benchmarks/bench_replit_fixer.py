@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the ReplitFixer phases
+
+Generates synthetic Repl trees and times scan_directory, identify_framework,
+check_for_common_issues and fix_issues separately. Results are written as JSON
+and can be compared against a stored baseline to flag regressions:
+
+    python benchmarks/bench_replit_fixer.py --output baseline.json
+    python benchmarks/bench_replit_fixer.py --compare baseline.json
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replit_fixer import ReplitFixer  # noqa: E402
+
+PHASES = ('scan_directory', 'identify_framework', 'check_for_common_issues', 'fix_issues')
+
+FLASK_APP = """from flask import Flask, jsonify
+
+app = Flask(__name__)
+
+
+@app.route('/')
+def index():
+    return jsonify(status='ok')
+
+
+if __name__ == '__main__':
+    app.run(port={port}, debug=True)
+"""
+
+DJANGO_MODULE = """from django.db import models
+
+
+class Item(models.Model):
+    name = models.CharField(max_length=100)
+"""
+
+PLAIN_MODULE = """import os
+import json
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+"""
+
+
+def _pad(content, size, comment):
+    """Pad generated source up to roughly `size` bytes with filler lines"""
+    filler = f"{comment} filler line to reach the configured file size\n"
+    missing = max(0, size - len(content))
+    return content + filler * (missing // len(filler) + 1) if missing else content
+
+
+def _directory(rng, root, depth):
+    parts = [f"pkg{rng.randrange(4)}" for _ in range(rng.randrange(depth + 1))]
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def generate_tree(root, py_files=200, js_files=100, html_files=20, file_size=2048, depth=3,
+                  node_modules_files=500, bundles=2, bundle_size=2 * 1024 * 1024, seed=0):
+    """Write a synthetic Repl tree under `root`"""
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    with open(os.path.join(root, '.replit'), 'w') as f:
+        f.write('run = ["python", "main.py"]\n')
+    with open(os.path.join(root, 'requirements.txt'), 'w') as f:
+        f.write("flask\n")
+    with open(os.path.join(root, 'main.py'), 'w') as f:
+        f.write(_pad(FLASK_APP.format(port=5000), file_size, '#'))
+    with open(os.path.join(root, 'package.json'), 'w') as f:
+        json.dump({'name': 'bench', 'dependencies': {'express': '^4.0.0'}}, f)
+
+    for i in range(py_files):
+        kind = rng.random()
+        if kind < 0.05:
+            content = FLASK_APP.format(port=5000 + i)
+        elif kind < 0.10:
+            content = DJANGO_MODULE
+        else:
+            content = PLAIN_MODULE
+        with open(os.path.join(_directory(rng, root, depth), f"module_{i}.py"), 'w') as f:
+            f.write(_pad(content, file_size, '#'))
+
+    for i in range(js_files):
+        with open(os.path.join(_directory(rng, root, depth), f"script_{i}.js"), 'w') as f:
+            f.write(_pad(f"const value{i} = require('./script_{i + 1}');\n", file_size, '//'))
+
+    for i in range(html_files):
+        with open(os.path.join(_directory(rng, root, depth), f"page_{i}.html"), 'w') as f:
+            f.write(_pad(f"<html><body><h1>Page {i}</h1></body></html>\n", file_size, '<!-- -->'))
+
+    for i in range(node_modules_files):
+        package = os.path.join(root, 'node_modules', f"dep{i % 50}", 'lib')
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"file_{i}.js"), 'w') as f:
+            f.write(_pad("module.exports = {};\n", file_size, '//'))
+
+    # Minified single-line bundles, the way a build step leaves them behind
+    assets = os.path.join(root, 'dist', 'public', 'assets')
+    os.makedirs(assets, exist_ok=True)
+    for i in range(bundles):
+        statement = "var a=function(){return 1};"
+        with open(os.path.join(assets, f"index-{rng.getrandbits(40):010x}.js"), 'w') as f:
+            f.write(statement * (bundle_size // len(statement)))
+
+
+def time_phases(template, cache=False):
+    """Time every phase once on a fresh copy of the template tree"""
+    workdir = tempfile.mkdtemp(prefix='replit-fixer-bench-')
+    tree = os.path.join(workdir, 'repl')
+    shutil.copytree(template, tree, symlinks=True)
+    try:
+        if cache:
+            # Warm the scan manifest so the run measures the incremental path
+            warm = ReplitFixer(root=tree)
+            warm.scan_directory()
+            warm.identify_framework()
+
+        fixer = ReplitFixer(root=tree, use_cache=cache)
+        timings = {}
+        for phase in PHASES:
+            started = time.perf_counter()
+            getattr(fixer, phase)()
+            timings[phase] = time.perf_counter() - started
+        return timings
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_benchmark(config, repeat, cache):
+    """Generate the tree once and time all phases `repeat` times"""
+    template_dir = tempfile.mkdtemp(prefix='replit-fixer-template-')
+    try:
+        template = os.path.join(template_dir, 'repl')
+        generate_tree(template, **config)
+        runs = [time_phases(template, cache) for _ in range(repeat)]
+    finally:
+        shutil.rmtree(template_dir, ignore_errors=True)
+
+    phases = {}
+    for phase in PHASES + ('total',):
+        samples = [sum(run.values()) if phase == 'total' else run[phase] for run in runs]
+        phases[phase] = {
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'max': max(samples),
+            'runs': samples,
+        }
+    return {
+        'config': dict(config, repeat=repeat, cache=cache),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'timestamp': time.time(),
+        'phases': phases,
+    }
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Return the phases whose median got slower than the baseline by more than the threshold"""
+    regressions = []
+    for phase, stats in results['phases'].items():
+        reference = baseline.get('phases', {}).get(phase)
+        if reference is None:
+            continue
+        delta = stats['median'] - reference['median']
+        if delta > min_delta and stats['median'] > reference['median'] * (1 + threshold):
+            regressions.append({
+                'phase': phase,
+                'baseline': reference['median'],
+                'current': stats['median'],
+                'change': delta / reference['median'] if reference['median'] else float('inf'),
+            })
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the ReplitFixer phases on a synthetic Repl tree.")
+    parser.add_argument('--py-files', type=int, default=200, help="number of .py files (default: 200)")
+    parser.add_argument('--js-files', type=int, default=100, help="number of .js files (default: 100)")
+    parser.add_argument('--html-files', type=int, default=20, help="number of .html files (default: 20)")
+    parser.add_argument('--file-size', type=int, default=2048, metavar='BYTES', help="approximate size of each source file (default: 2048)")
+    parser.add_argument('--depth', type=int, default=3, help="maximum directory depth (default: 3)")
+    parser.add_argument('--node-modules', type=int, default=500, metavar='FILES', help="files of node_modules noise (default: 500)")
+    parser.add_argument('--bundles', type=int, default=2, help="number of large minified bundles (default: 2)")
+    parser.add_argument('--bundle-size', type=int, default=2 * 1024 * 1024, metavar='BYTES', help="size of each bundle (default: 2 MiB)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the generated tree (default: 0)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per phase (default: 5)")
+    parser.add_argument('--cache', action='store_true', help="warm and use the scan manifest (incremental path)")
+    parser.add_argument('--output', metavar='FILE', help="write the JSON results to FILE instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="flag regressions against a stored JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative slowdown counted as a regression (default: 0.10)")
+    parser.add_argument('--min-delta', type=float, default=0.005, metavar='SECONDS',
+                        help="ignore slowdowns smaller than this in absolute terms (default: 0.005)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger("ReplitFixer").setLevel(logging.WARNING)
+
+    config = {
+        'py_files': args.py_files,
+        'js_files': args.js_files,
+        'html_files': args.html_files,
+        'file_size': args.file_size,
+        'depth': args.depth,
+        'node_modules_files': args.node_modules,
+        'bundles': args.bundles,
+        'bundle_size': args.bundle_size,
+        'seed': args.seed,
+    }
+    results = run_benchmark(config, args.repeat, args.cache)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        results['regressions'] = compare(results, baseline, args.threshold, args.min_delta)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for phase in PHASES + ('total',):
+        stats = results['phases'][phase]
+        print(f"{phase:<26} median {stats['median'] * 1000:9.1f}ms  min {stats['min'] * 1000:9.1f}ms", file=sys.stderr)
+
+    if results.get('regressions'):
+        for regression in results['regressions']:
+            print(f"REGRESSION {regression['phase']}: {regression['baseline'] * 1000:.1f}ms -> "
+                  f"{regression['current'] * 1000:.1f}ms ({regression['change']:+.0%})", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
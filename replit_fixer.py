@@ -4,37 +4,2312 @@ Replit Application Diagnostic and Repair Tool
 
 This script helps diagnose and fix common issues in Replit applications.
 Run this script to perform an automatic diagnosis and get recommendations for fixing your application.
+
+Without a subcommand it diagnoses, fixes, installs dependencies and runs the
+application. The scan, check, fix, install and run subcommands perform a
+single step and exit non-zero on failure, e.g. as a pre-commit hook:
+
+    python -m replit_fixer check
 """
 
-import os
-import sys
-import subprocess
-import logging
-import re
-import json
-import importlib
-import pkgutil
-import time
-from pathlib import Path
+import os
+import sys
+import logging
+import re
+import json
+import time
+import ast
+import errno
+import contextlib
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger("ReplitFixer")
+
+# Upper bound on the decoded file contents kept in memory between phases
+CONTENT_CACHE_BUDGET = 64 * 1024 * 1024
+# Files at least this large are mapped instead of read into an intermediate buffer
+MMAP_THRESHOLD = 1024 * 1024
+
+# Per-repl cache directory holding the scan manifest
+CACHE_DIR = os.path.join('.replit_fixer', 'cache')
+# Bump whenever the shape of the per-file import index changes so stale manifests are discarded
+MANIFEST_VERSION = 3
+# Files modified this close to the manifest write may change again without a visible mtime change
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+# Smallest number of files worth starting a process pool for
+PARALLEL_MIN_FILES = 64
+# Largest number of files sent to a worker in one task
+PARALLEL_CHUNK_SIZE = 256
+
+# Directories never descended into while scanning
+SKIPPED_DIRECTORIES = ('node_modules', '__pycache__', '.git', 'venv', '.venv', '.replit_fixer')
+# Build output directories: recorded as build artifacts but never classified as sources
+GENERATED_DIRECTORIES = ('dist', 'build', '.next', '.nuxt', '.svelte-kit', '.parcel-cache', '.turbo', 'coverage')
+# Files whose rules are honoured while scanning, in every directory they appear in
+IGNORE_FILES = ('.gitignore', '.replitignore')
+# JavaScript files larger than this are treated as build artifacts without being opened
+MAX_SOURCE_FILE_SIZE = 1024 * 1024
+# JavaScript files larger than this get their first block sampled for minification
+SAMPLE_THRESHOLD = 32 * 1024
+# Bundler output names such as index-Bg0y4OUR.js or main.3f2a9c1d.js
+HASHED_BUNDLE_NAME = re.compile(
+    r'[.-](?:[0-9a-f]{8,32}|(?=[\w-]{0,7}\d)(?=[\w-]{0,7}[A-Z])(?=[\w-]{0,7}[a-z])[\w-]{8})\.(?:js|mjs|cjs|css)$')
+# Digit-free base64url hashes such as index-CyvCCUlD.css; CamelCase and plain words are names, not hashes
+BASE64_BUNDLE_HASH = re.compile(r'[.-](?=[\w-]{0,7}[A-Z])(?![A-Z]?[a-z]+(?:[A-Z][a-z]+)*\.)[\w-]{8}\.(?:js|mjs|cjs|css)$')
+
+# Build output directories whose contents are shipped; coverage reports and build caches are not
+SHIPPED_DIRECTORIES = ('dist', 'build', '.next', '.nuxt', '.svelte-kit')
+# Text assets worth serving precompressed
+COMPRESSIBLE_ASSETS = ('.js', '.mjs', '.cjs', '.css', '.html', '.svg', '.json', '.xml', '.txt', '.wasm')
+BUNDLE_ASSETS = ('.js', '.mjs', '.cjs', '.css')
+# Bundles larger than this are reported as oversized, the same budget webpack warns about
+MAX_BUNDLE_SIZE = 250000
+# Assets smaller than this, or that compress by less than MIN_COMPRESSION_GAIN, are not worth precompressing
+MIN_PRECOMPRESS_SIZE = 1024
+MIN_COMPRESSION_GAIN = 0.1
+# Suffix of the precompressed copy a static file server looks for, per encoding
+PRECOMPRESSED_SUFFIXES = OrderedDict([('gzip', '.gz'), ('brotli', '.br')])
+
+# Calls recorded in the import index because they decide which host and port a server binds to
+BINDING_CALLS = ('app.run', 'uvicorn.run')
+
+# Marker cached for files that are not valid UTF-8 so later phases skip them without re-reading
+_UNDECODABLE = object()
+
+
+class FileContentStore:
+    """Lazily loaded, size-bounded cache of file contents shared by every phase
+
+    Files are only read the first time a phase asks for them. Decoded contents
+    are kept in LRU order until the byte budget is exhausted; files that are
+    larger than the whole budget are served without being cached.
+    """
+
+    def __init__(self, root, byte_budget=CONTENT_CACHE_BUDGET, mmap_threshold=MMAP_THRESHOLD):
+        self.root = root
+        self.byte_budget = byte_budget
+        self.mmap_threshold = mmap_threshold
+        self.bytes_read = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._cached_bytes = 0
+
+    def read(self, rel_path):
+        """Return the decoded content of a file, raising UnicodeDecodeError for binary files"""
+        entry = self._entries.get(rel_path)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(rel_path)
+            if entry is _UNDECODABLE:
+                raise UnicodeDecodeError('utf-8', b'', 0, 1, f"{rel_path} is not valid UTF-8")
+            return entry
+
+        self.misses += 1
+        try:
+            content, size = self._load(rel_path)
+        except UnicodeDecodeError:
+            self._remember(rel_path, _UNDECODABLE, 0)
+            raise
+        if size <= self.byte_budget:
+            self._remember(rel_path, content, size)
+        return content
+
+    def invalidate(self, rel_path):
+        """Drop a cached entry, e.g. after the file has been rewritten"""
+        if rel_path in self._entries:
+            del self._entries[rel_path]
+            self._cached_bytes -= self._sizes.pop(rel_path)
+
+    def _load(self, rel_path):
+        path = os.path.join(self.root, rel_path)
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.bytes_read += size
+            if size >= self.mmap_threshold:
+                import mmap
+                
+                # Decode straight from the mapping to avoid an extra copy of large files
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return str(mapped, 'utf-8'), size
+            return f.read().decode('utf-8'), size
+
+    def _remember(self, rel_path, content, size):
+        self.invalidate(rel_path)
+        self._entries[rel_path] = content
+        self._sizes[rel_path] = size
+        self._cached_bytes += size
+        while self._cached_bytes > self.byte_budget and self._entries:
+            oldest, _ = self._entries.popitem(last=False)
+            self._cached_bytes -= self._sizes.pop(oldest)
+
+
+class ImportSignatureDetector:
+    """Finds framework import signatures in a single pass over a file
+
+    All import statements of a language are matched by one compiled
+    alternation and the imported top-level module is looked up in a table of
+    registered signatures, so adding a framework does not add another pass.
+    Scanning a file stops as soon as every signature has been seen and, for
+    Python, at the first top-level statement that is not part of the import
+    preamble (imports, docstrings, comments, dunder assignments and the
+    try/if blocks that usually guard optional imports).
+    """
+
+    PATTERNS = {
+        'python': re.compile(
+            r'''^[ \t]*(?:(?P<comment>\#)'''
+            r'''|(?P<docstring>[rRbBuU]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'))'''
+            r'''|from[ \t]+(?P<from>[\w.]+)[ \t]+import\b'''
+            r'''|import[ \t]+(?P<import>[^\n#;]+))'''
+            r'''|^(?P<body>(?!(?:import|from|try|except|else|finally|if|elif|with)\b|__\w+__)[A-Za-z_@])''',
+            re.MULTILINE),
+        'javascript': re.compile(
+            r'''\brequire\(\s*['"](?P<require>[^'"]+)['"]\s*\)'''
+            r'''|\bfrom\s+['"](?P<from>[^'"]+)['"]'''
+            r'''|^\s*import\s+['"](?P<import>[^'"]+)['"]''',
+            re.MULTILINE),
+    }
+
+    def __init__(self):
+        self.signatures = OrderedDict()
+        self._modules = {language: {} for language in self.PATTERNS}
+
+    def register(self, name, label, modules, language='python'):
+        """Register a framework detected by importing any of the given top-level modules"""
+        if language not in self.PATTERNS:
+            raise ValueError(f"Unsupported language for import signatures: {language}")
+        self.signatures[name] = {'label': label, 'modules': list(modules), 'language': language}
+        for module in modules:
+            self._modules[language][module] = name
+
+    def names(self, language='python'):
+        """Return the registered signature names for a language in registration order"""
+        return [name for name, signature in self.signatures.items() if signature['language'] == language]
+
+    def label(self, name):
+        return self.signatures[name]['label']
+
+    def iter_imports(self, content, language='python'):
+        """Yield the modules imported by a file, stopping at the end of a Python import preamble"""
+        for match in self.PATTERNS[language].finditer(content):
+            kind = match.lastgroup
+            if kind in ('comment', 'docstring'):
+                continue
+            if kind == 'body':
+                return
+
+            value = match.group(kind)
+            if kind == 'import' and language == 'python':
+                for part in value.split(','):
+                    if part.strip():
+                        yield part.split()[0]
+            else:
+                yield value
+
+    def detect(self, content, language='python'):
+        """Return the names of the signatures imported by a file in registration order"""
+        table = self._modules[language]
+        remaining = len(set(table.values()))
+        found = set()
+        if not remaining:
+            return []
+
+        for module in self.iter_imports(content, language):
+            name = table.get(self._top_level(module, language))
+            if name is not None and name not in found:
+                found.add(name)
+                remaining -= 1
+                if not remaining:
+                    break
+
+        return [name for name in self.signatures if name in found]
+
+    def detect_modules(self, modules, language='python'):
+        """Return the names of the signatures matched by an already extracted list of imports"""
+        table = self._modules[language]
+        found = {table.get(self._top_level(module, language)) for module in modules}
+        return [name for name in self.signatures if name in found]
+
+    @staticmethod
+    def _top_level(module, language):
+        if language == 'javascript':
+            parts = module.split('/')
+            return '/'.join(parts[:2]) if module.startswith('@') else parts[0]
+        return module.split('.')[0]
+
+
+DETECTOR = ImportSignatureDetector()
+DETECTOR.register('flask', 'Flask', ['flask'])
+DETECTOR.register('django', 'Django', ['django'])
+DETECTOR.register('fastapi', 'FastAPI', ['fastapi'])
+DETECTOR.register('starlette', 'Starlette', ['starlette'])
+DETECTOR.register('aiohttp', 'aiohttp', ['aiohttp'])
+
+
+def build_python_index(content):
+    """Index the imports and server start-up calls of one Python file
+
+    The index is built once per distinct file content and every later check
+    queries it instead of re-scanning the text, so imports or app.run() calls
+    that only appear in comments or strings are never reported. Files that do
+    not parse fall back to a token-level import scan without call sites.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {'parser': 'tokenize', 'imports': _tokenize_imports(content), 'calls': []}
+
+    imports = set()
+    for node in _iter_statements(tree.body):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and not node.level:
+                imports.add(node.module)
+
+    calls = []
+    # Visiting every expression node is the expensive part, so only do it when a call can be present
+    if any(target in content for target in BINDING_CALLS):
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                target = _call_target(node.func)
+                if target in BINDING_CALLS:
+                    calls.append({
+                        'target': target,
+                        'start': [node.lineno, node.col_offset],
+                        'end': [node.end_lineno, node.end_col_offset],
+                        'args': [_index_value(arg) for arg in node.args],
+                        'kwargs': {keyword.arg: _index_value(keyword.value) for keyword in node.keywords if keyword.arg},
+                    })
+        # ast.walk() is breadth-first; report calls in source order
+        calls.sort(key=lambda call: call['start'])
+
+    return {'parser': 'ast', 'imports': sorted(imports), 'calls': calls}
+
+
+def _iter_statements(body):
+    # Imports are statements, so nested statement bodies are all that need visiting
+    for node in body:
+        yield node
+        for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                yield from _iter_statements(children)
+
+
+def _call_target(func):
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return f"{func.value.id}.{func.attr}"
+    return None
+
+
+def _index_value(node):
+    # Positions are (line, UTF-8 byte column) as reported by ast
+    value = {'start': [node.lineno, node.col_offset], 'end': [node.end_lineno, node.end_col_offset]}
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float, bool)):
+        value['value'] = node.value
+    return value
+
+
+def _tokenize_imports(content):
+    import io
+    import tokenize
+    
+    modules = set()
+    statement = None
+    at_start = True
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            if token.type in (tokenize.NEWLINE, tokenize.NL) or token.string == ';':
+                if statement:
+                    modules.update(_statement_modules(statement))
+                statement = None
+                at_start = True
+            elif token.type in (tokenize.INDENT, tokenize.DEDENT, tokenize.COMMENT):
+                continue
+            elif at_start and token.type == tokenize.NAME and token.string in ('import', 'from'):
+                statement = [token.string]
+                at_start = False
+            else:
+                if statement is not None:
+                    statement.append(token.string)
+                at_start = False
+    except (tokenize.TokenError, SyntaxError):
+        # Not even tokenizable; fall back to the regex scan of the import preamble
+        modules.update(DETECTOR.iter_imports(content))
+    return sorted(modules)
+
+
+def _statement_modules(statement):
+    if statement[0] == 'from':
+        module = []
+        for part in statement[1:]:
+            if part == 'import':
+                break
+            module.append(part)
+        # Relative imports never name a framework
+        return [''.join(module)] if module and not module[0].startswith('.') else []
+
+    modules = []
+    current = []
+    alias = False
+    for part in statement[1:] + [',']:
+        if part == ',':
+            if current:
+                modules.append(''.join(current))
+            current = []
+            alias = False
+        elif part == 'as':
+            alias = True
+        elif not alias:
+            current.append(part)
+    return modules
+
+
+def _byte_offset(line_starts, position):
+    line, column = position
+    return line_starts[line - 1] + column
+
+
+def call_binding(call):
+    """Return the indexed (host, port) arguments of a server start-up call, None where absent"""
+    kwargs = call['kwargs']
+    # app.run(host, port, ...) accepts them positionally; uvicorn.run() only by keyword
+    positional = call['args'] if call['target'] == 'app.run' else []
+    host = kwargs.get('host') or (positional[0] if len(positional) > 0 else None)
+    port = kwargs.get('port') or (positional[1] if len(positional) > 1 else None)
+    return host, port
+
+
+def content_digest(data):
+    """Return the content hash recorded in the scan manifest"""
+    from hashlib import blake2b
+    
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def _index_chunk(root, rel_paths):
+    """Process pool worker: read and index a chunk of files
+
+    Returns one compact (digest, index) pair per path, (None, None) for binary
+    files and None for files that could not be read, along with the number of
+    files and bytes read so the parent can account for them.
+    """
+    results = []
+    files_read = bytes_read = 0
+    for rel_path in rel_paths:
+        try:
+            with open(os.path.join(root, rel_path), 'rb') as f:
+                data = f.read()
+            files_read += 1
+            bytes_read += len(data)
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            results.append((None, None))
+            continue
+        except OSError:
+            results.append(None)
+            continue
+        results.append((content_digest(data), build_python_index(content)))
+    return results, files_read, bytes_read
+
+
+def make_cache_directory(path):
+    """Create the directory for a file under CACHE_DIR, and a .gitignore that keeps the whole cache out of git"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Like pytest's and ruff's caches, so diagnosed repositories do not gain an untracked directory
+    if directory.endswith(CACHE_DIR):
+        gitignore = os.path.join(directory[:-len(CACHE_DIR)], CACHE_DIR.split(os.sep)[0], '.gitignore')
+        if not os.path.exists(gitignore):
+            with open(gitignore, 'w') as f:
+                f.write("# Created by replit_fixer automatically.\n*\n")
+
+
+class ScanManifest:
+    """Persisted record of file stats, content hashes and per-file import indexes
+
+    An entry is trusted as-is while the file's size and mtime are unchanged. When
+    they differ the content hash decides whether a stored index still applies,
+    so touching, copying or renaming a file does not trigger a re-index.
+    Indexes are keyed by content hash and shared between identical files.
+    Compressed sizes of static assets are kept alongside, trusted the same way.
+    A read-only manifest is loaded and updated in memory but never written.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.entries = {}
+        self.indexes = {}
+        self.assets = {}
+        self.loaded = False
+        self.dirty = False
+
+    def load(self):
+        """Load the manifest from disk once, starting empty if it is missing or outdated"""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('files', {})
+            self.indexes = data.get('indexes', {})
+            self.assets = data.get('assets', {})
+
+    def lookup(self, rel_path, st):
+        """Return the stored entry if the file's stat data proves it is unchanged"""
+        entry = self.entries.get(rel_path)
+        if (entry is not None and not entry.get('racy')
+                and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns):
+            return entry
+        return None
+
+    def index_for(self, digest):
+        """Return the stored index for a content hash, if any"""
+        return self.indexes.get(digest) if digest is not None else None
+
+    def record(self, rel_path, st, digest, index):
+        """Store the stat data and content hash of a file and the index of its content"""
+        self.entries[rel_path] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'hash': digest,
+        }
+        if digest is not None:
+            self.indexes[digest] = index
+        self.dirty = True
+
+    def asset_sizes(self, rel_path, st):
+        """Return the stored compressed sizes of an asset if its stat data proves it is unchanged"""
+        entry = self.assets.get(rel_path)
+        if (entry is not None and not entry.get('racy')
+                and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns):
+            return entry['compressed']
+        return None
+
+    def record_asset(self, rel_path, st, compressed):
+        """Store the stat data of an asset and its compressed size per encoding"""
+        self.assets[rel_path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'compressed': compressed}
+        self.dirty = True
+
+    def prune_assets(self, live_paths):
+        """Forget assets that are no longer shipped"""
+        for path in [path for path in self.assets if path not in live_paths]:
+            del self.assets[path]
+            self.dirty = True
+
+    def prune(self, live_paths):
+        """Forget files that no longer exist and indexes nothing refers to, returning the removed paths"""
+        removed = [path for path in self.entries if path not in live_paths]
+        for path in removed:
+            del self.entries[path]
+        referenced = {entry['hash'] for entry in self.entries.values()}
+        for digest in [digest for digest in self.indexes if digest not in referenced]:
+            del self.indexes[digest]
+            self.dirty = True
+        if removed:
+            self.dirty = True
+        return removed
+
+    def save(self):
+        """Atomically write the manifest if anything changed"""
+        if not self.dirty or self.read_only:
+            return
+        now_ns = time.time_ns()
+        for entry in list(self.entries.values()) + list(self.assets.values()):
+            if now_ns - entry['mtime_ns'] < RACY_WINDOW_NS:
+                entry['racy'] = True
+            else:
+                entry.pop('racy', None)
+        try:
+            make_cache_directory(self.path)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': self.entries, 'indexes': self.indexes,
+                           'assets': self.assets}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"Could not write scan manifest: {str(e)}")
+
+
+# pip options that change where packages come from and must accompany a partial install
+PIP_SOURCE_OPTIONS = ('-i', '--index-url', '--extra-index-url', '-f', '--find-links', '--trusted-host', '--no-index', '--pre')
+# Start of per-requirement options such as --hash or --config-settings that follow a specifier on its line
+PER_REQUIREMENT_OPTION = re.compile(r'\s+--?[A-Za-z]')
+
+
+def _load_packaging():
+    """Return packaging's (Requirement, Version) classes, preferring a standalone install over pip's copy"""
+    import importlib
+    
+    for package in ('packaging', 'pip._vendor.packaging'):
+        try:
+            requirements = importlib.import_module(f"{package}.requirements")
+            version = importlib.import_module(f"{package}.version")
+        except ImportError:
+            continue
+        return requirements.Requirement, version.Version
+    return None, None
+
+
+class PythonRequirementChecker:
+    """Decides which declared Python requirements pip actually needs to install
+
+    Requirements from requirements.txt (following -r includes) and from the
+    [project] table of pyproject.toml are compared against the distributions
+    visible to this interpreter through importlib.metadata. Anything that cannot
+    be evaluated locally (editable installs, URLs, unparseable lines) is always
+    handed to pip, so the fast path never skips something it should not.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.requirement_class, self.version_class = _load_packaging()
+
+    def collect(self, requirements_txt=None, pyproject_toml=None):
+        """Return (requirements, pip_options) declared by the given files"""
+        requirements = []
+        options = []
+        if requirements_txt:
+            self._read_requirements_file(os.path.join(self.root, requirements_txt), requirements, options, set())
+        if pyproject_toml:
+            requirements.extend(self._read_pyproject(os.path.join(self.root, pyproject_toml)))
+        # Keep the first occurrence of each line so the install order stays stable
+        return list(OrderedDict.fromkeys(requirements)), options
+
+    def check(self, requirement):
+        """Classify one requirement as 'satisfied', 'missing', 'mismatch' or 'unknown' with a short detail"""
+        from importlib import metadata
+        
+        if self.requirement_class is None:
+            return 'unknown', "packaging is not available"
+        try:
+            req = self.requirement_class(PER_REQUIREMENT_OPTION.split(requirement, 1)[0])
+        except Exception:
+            return 'unknown', "not a plain requirement specifier"
+        if req.marker is not None and not req.marker.evaluate():
+            return 'satisfied', "not required on this platform"
+        if req.url:
+            return 'unknown', "direct URL requirement"
+
+        try:
+            installed = metadata.version(req.name)
+        except metadata.PackageNotFoundError:
+            return 'missing', "not installed"
+        if req.specifier and not req.specifier.contains(installed, prereleases=True):
+            return 'mismatch', f"{installed} installed, {req.specifier} required"
+
+        for extra in sorted(req.extras):
+            for dependency in metadata.requires(req.name) or ():
+                dependency_req = self.requirement_class(dependency)
+                if dependency_req.marker is None or not dependency_req.marker.evaluate({'extra': extra}):
+                    continue
+                status, detail = self.check(str(dependency_req).split(';')[0])
+                if status != 'satisfied':
+                    return status, f"extra '{extra}' needs {dependency_req.name}: {detail}"
+        return 'satisfied', f"{installed} installed"
+
+    def plan(self, requirements_txt=None, pyproject_toml=None):
+        """Check every declared requirement and return the ones pip still has to install"""
+        requirements, options = self.collect(requirements_txt, pyproject_toml)
+        satisfied = []
+        install = []
+        for requirement in requirements:
+            status, detail = self.check(requirement)
+            if status == 'satisfied':
+                satisfied.append((requirement, detail))
+            else:
+                install.append((requirement, detail))
+        return {'satisfied': satisfied, 'install': install, 'options': options}
+
+    def _read_requirements_file(self, path, requirements, options, seen):
+        path = os.path.normpath(path)
+        if path in seen:
+            return
+        seen.add(path)
+        try:
+            with open(path, 'r') as f:
+                # Join backslash continuations before splitting into lines
+                lines = f.read().replace('\\\n', '').splitlines()
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {str(e)}")
+            return
+
+        for line in lines:
+            line = re.sub(r'(^|\s)#.*$', '', line).strip()
+            if not line:
+                continue
+            if line.startswith(('-r ', '--requirement ', '-r', '--requirement=')):
+                include = re.sub(r'^(-r|--requirement)[=\s]*', '', line)
+                self._read_requirements_file(os.path.join(os.path.dirname(path), include), requirements, options, seen)
+            elif line.startswith(('-c', '--constraint')):
+                # Constraints only narrow versions of packages that are installed anyway
+                continue
+            elif line.startswith(PIP_SOURCE_OPTIONS):
+                options.extend(line.split(None, 1) if ' ' in line else [line])
+            else:
+                requirements.append(line)
+
+    def _read_pyproject(self, path):
+        import tomllib
+        
+        try:
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            logger.warning(f"Could not read {path}: {str(e)}")
+            return []
+        return list(data.get('project', {}).get('dependencies', []))
+
+
+class InstallHistory:
+    """Durations of previous pip runs, used to estimate the time a skipped install saves"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(self.path, 'r') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def seconds_per_requirement(self, tool):
+        record = self.data.get(tool)
+        if not record or not record.get('requirements'):
+            return None
+        return record['seconds'] / record['requirements']
+
+    def record(self, tool, seconds, requirements):
+        self.data[tool] = {'seconds': seconds, 'requirements': requirements}
+        try:
+            make_cache_directory(self.path)
+            with open(self.path, 'w') as f:
+                json.dump(self.data, f)
+        except OSError as e:
+            logger.warning(f"Could not write install history: {str(e)}")
+
+
+_JSON_TOKEN = re.compile(
+    r'''\s*(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<punct>[{}\[\]:,])'''
+    r'''|(?P<literal>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null))''')
+_JSON_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def iter_json_leaves(f, chunk_size=64 * 1024):
+    """Stream (path, value) pairs for every scalar in a JSON document
+
+    The file is tokenized in fixed-size chunks and only the path to the current
+    value is kept, so multi-megabyte lockfiles are read without ever building
+    the whole object. Paths are tuples of object keys and array indexes.
+    """
+    path = []
+    containers = []
+    expect_key = False
+    buffer = ''
+    position = 0
+    eof = False
+    while True:
+        # Keep some lookahead so a number or literal is never cut off at a chunk boundary;
+        # strings that do not fit yet simply fail to match and pull in more data
+        match = _JSON_TOKEN.match(buffer, position) if eof or len(buffer) - position >= 64 else None
+        if match is None:
+            if eof:
+                if buffer[position:].strip():
+                    raise ValueError(f"Invalid JSON near: {buffer[position:position + 40]!r}")
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = match.end()
+
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == 'punct':
+            if token == '{':
+                containers.append('object')
+                path.append(None)
+                expect_key = True
+            elif token == '[':
+                containers.append('array')
+                path.append(0)
+                expect_key = False
+            elif token in '}]':
+                containers.pop()
+                path.pop()
+                expect_key = False
+            elif token == ',':
+                if containers[-1] == 'array':
+                    path[-1] += 1
+                else:
+                    expect_key = True
+            continue
+
+        if kind == 'string':
+            value = token[1:-1] if '\\' not in token else json.loads(token)
+        else:
+            value = _JSON_LITERALS[token] if token in _JSON_LITERALS else json.loads(token)
+        if expect_key:
+            path[-1] = value
+            expect_key = False
+        else:
+            yield tuple(path), value
+
+
+# Dependency sections of package.json mirrored in the lockfile's package entries
+NPM_DEPENDENCY_FIELDS = ('dependencies', 'devDependencies', 'optionalDependencies', 'peerDependencies')
+
+
+def read_lockfile(path):
+    """Summarise an npm lockfile (or node_modules/.package-lock.json) by streaming it
+
+    Returns {'version': lockfileVersion, 'packages': {location: (version, optional)},
+    'declared': {location: {field: {name: spec}}}} where 'declared' holds the
+    dependency sections recorded for the root and workspace packages.
+    """
+    summary = {'version': None, 'packages': {}, 'declared': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, value in iter_json_leaves(f):
+            if key == ('lockfileVersion',):
+                summary['version'] = value
+            if len(key) < 3 or key[0] != 'packages':
+                continue
+            location = key[1]
+            if location == '' or not location.startswith('node_modules/') and '/node_modules/' not in location:
+                # The root project and workspace members record what their package.json declared
+                if len(key) == 4 and key[2] in NPM_DEPENDENCY_FIELDS:
+                    summary['declared'].setdefault(location, {}).setdefault(key[2], {})[key[3]] = value
+                continue
+            if len(key) != 3:
+                continue
+            entry = summary['packages'].setdefault(location, [None, False, False])
+            if key[2] == 'version':
+                entry[0] = value
+            elif key[2] == 'optional':
+                entry[1] = bool(value)
+            elif key[2] == 'link':
+                entry[2] = bool(value)
+    return summary
+
+
+def workspace_patterns(package_data):
+    """Return the workspace globs declared by a package.json"""
+    workspaces = package_data.get('workspaces') or []
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get('packages') or []
+    return [pattern.rstrip('/') for pattern in workspaces if isinstance(pattern, str)]
+
+
+class NpmLockfileChecker:
+    """Decides whether a package tree needs npm at all, and if so which command
+
+    * no package-lock.json: ``npm install`` has to create one
+    * package.json declares something the lockfile does not: ``npm install``
+    * node_modules missing or out of step with the lockfile: ``npm ci``
+    * otherwise the tree is in sync and npm is skipped
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def plan(self, tree, members=()):
+        """Return (command or None, reason) for the package tree rooted at the relative directory `tree`"""
+        tree_path = os.path.join(self.root, tree)
+        lockfile_path = os.path.join(tree_path, 'package-lock.json')
+        hidden_path = os.path.join(tree_path, 'node_modules', '.package-lock.json')
+        if not os.path.exists(lockfile_path):
+            return ['npm', 'install'], "no package-lock.json"
+
+        try:
+            lockfile = read_lockfile(lockfile_path)
+        except (OSError, ValueError) as e:
+            return ['npm', 'install'], f"unreadable package-lock.json ({str(e)})"
+        if not isinstance(lockfile['version'], int) or lockfile['version'] < 2:
+            return ['npm', 'install'], f"lockfileVersion {lockfile['version']} has no package inventory"
+
+        for location in ['', *members]:
+            stale = self._stale_declaration(tree_path, location, lockfile['declared'].get(location, {}))
+            if stale:
+                return ['npm', 'install'], stale
+
+        if not os.path.exists(hidden_path):
+            return ['npm', 'ci'], "node_modules is missing or was not installed by npm 7+"
+        try:
+            installed = read_lockfile(hidden_path)
+        except (OSError, ValueError) as e:
+            return ['npm', 'ci'], f"unreadable node_modules/.package-lock.json ({str(e)})"
+
+        drift = self._drift(lockfile['packages'], installed['packages'])
+        if drift:
+            return ['npm', 'ci'], drift
+        return None, f"node_modules matches package-lock.json ({len(installed['packages'])} packages)"
+
+    def _stale_declaration(self, tree_path, location, declared):
+        try:
+            with open(os.path.join(tree_path, location, 'package.json'), 'r') as f:
+                package_data = json.load(f)
+        except (OSError, ValueError) as e:
+            return f"cannot read {os.path.join(location, 'package.json')} ({str(e)})"
+        for field in NPM_DEPENDENCY_FIELDS:
+            if (package_data.get(field) or {}) != declared.get(field, {}):
+                return f"{field} of {os.path.join(location, 'package.json')} changed since package-lock.json was written"
+        return None
+
+    @staticmethod
+    def _drift(locked, installed):
+        for location, (version, optional, link) in locked.items():
+            if link:
+                continue
+            present = installed.get(location)
+            if present is None:
+                # Optional packages for other platforms are legitimately absent
+                if not optional:
+                    return f"{location} is not installed"
+            elif present[0] != version:
+                return f"{location} is {present[0]}, lockfile wants {version}"
+        for location in installed:
+            if location not in locked:
+                return f"{location} is installed but not in the lockfile"
+        return None
+
+
+class AsyncInstaller:
+    """Runs independent install commands concurrently with streamed, prefixed output
+
+    Each job is a dict with a 'name' used as the log prefix, a 'command' and a
+    'cwd'. At most `concurrency` children run at once and each is killed once
+    it exceeds `timeout` seconds. Results come back in job order.
+    """
+
+    def __init__(self, concurrency=4, timeout=900):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+
+    def run(self, jobs):
+        """Run all jobs and return one result dict per job"""
+        import asyncio
+        
+        return asyncio.run(self._run_all(jobs))
+
+    async def _run_all(self, jobs):
+        import asyncio
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._run_one(job, semaphore) for job in jobs))
+
+    async def _run_one(self, job, semaphore):
+        import asyncio
+        
+        async with semaphore:
+            result = {'name': job['name'], 'command': job['command'], 'cwd': job['cwd'],
+                      'returncode': None, 'timed_out': False, 'error': None}
+            result['started'] = time.perf_counter()
+            logger.info(f"[{job['name']}] $ {' '.join(job['command'])}")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *job['command'], cwd=job['cwd'], start_new_session=True,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            except OSError as e:
+                result['error'] = str(e)
+            else:
+                streams = asyncio.gather(self._stream(job['name'], process.stdout, logging.INFO),
+                                         self._stream(job['name'], process.stderr, logging.WARNING))
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    result['timed_out'] = True
+                    self._kill_group(process)
+                    await process.wait()
+                except asyncio.CancelledError:
+                    # Children run in their own session, so Ctrl+C never reaches them; don't leave
+                    # npm or pip writing node_modules or site-packages in the background
+                    self._kill_group(process)
+                    streams.cancel()
+                    raise
+                await streams
+                result['returncode'] = process.returncode
+            result['finished'] = time.perf_counter()
+            result['duration'] = result['finished'] - result['started']
+            return result
+
+    @staticmethod
+    def _kill_group(process):
+        import signal
+        
+        # npm and pip spawn helpers of their own; take down the whole process group
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+
+    @staticmethod
+    async def _stream(name, stream, level):
+        # Split lines ourselves: readline() raises on a line longer than the stream's buffer limit
+        pending = b''
+        while True:
+            chunk = await stream.read(64 * 1024)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                logger.log(level, f"[{name}] {line.decode('utf-8', 'replace').rstrip()}")
+        if pending:
+            logger.log(level, f"[{name}] {pending.decode('utf-8', 'replace').rstrip()}")
+
+
+def read_replit_config(root):
+    """Parse the .replit file of a repl, returning None if it is missing or not valid TOML"""
+    import tomllib
+    
+    try:
+        with open(os.path.join(root, '.replit'), 'rb') as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return None
+
+
+def replit_run_command(config):
+    """Return the run command of a parsed .replit as an argument list, or None if it has none
+
+    Both the top-level `run` and `[interpreter] run` are understood, given
+    either as an array of arguments or as a shell-style string.
+    """
+    import shlex
+    
+    for run in ((config or {}).get('run'), ((config or {}).get('interpreter') or {}).get('run')):
+        if isinstance(run, list) and run and all(isinstance(part, str) for part in run):
+            return run
+        if isinstance(run, str) and run.strip():
+            return shlex.split(run)
+    return None
+
+
+def replit_environment(config):
+    """Return the environment to run a repl with: ours, overridden by the `[env]` table of its parsed .replit"""
+    env = dict(os.environ)
+    for name, value in ((config or {}).get('env') or {}).items():
+        if isinstance(value, (str, int, float, bool)):
+            env[name] = str(value).lower() if isinstance(value, bool) else str(value)
+    return env
+
+
+# Addresses a server listening on "localhost" may have bound
+LOOPBACK_HOSTS = ('127.0.0.1', '::1')
+
+
+class ReadinessProbe:
+    """Waits for a freshly started application to accept connections on its port
+
+    TCP connects are attempted without blocking, with exponential backoff
+    between attempts, until the port accepts a connection, the process exits or
+    the deadline passes. Every address `host` resolves to is tried, and for
+    localhost both loopbacks are, since a server listening on localhost may have
+    bound only ::1 or only 127.0.0.1 whatever /etc/hosts says.
+    With a health path the port only counts as ready once an HTTP GET for it
+    answers with a non-5xx status.
+    """
+
+    def __init__(self, port, host='localhost', health_path=None, deadline=30.0, initial_delay=0.05, max_delay=0.5):
+        self.port = port
+        self.host = host
+        self.address = None
+        self._addresses = None
+        self.health_path = health_path
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+
+    def wait(self, process):
+        """Probe until ready or failed and return a report with the measured time-to-ready"""
+        started = time.perf_counter()
+        report = {'host': self.host, 'port': self.port, 'health_path': self.health_path,
+                  'ready': False, 'time_to_ready': None, 'attempts': 0, 'status': None, 'reason': None}
+        delay = self.initial_delay
+        while True:
+            if process.poll() is not None:
+                report['reason'] = f"process exited with code {process.returncode}"
+                return report
+            
+            report['attempts'] += 1
+            remaining = self.deadline - (time.perf_counter() - started)
+            if self._tcp_ready(min(max(remaining, 0), self.max_delay)):
+                report['host'] = self.address[4][0]
+                if self.health_path is None:
+                    report['ready'] = True
+                else:
+                    report['status'] = self._http_status(max(remaining, 0.1))
+                    report['ready'] = report['status'] is not None and report['status'] < 500
+            if report['ready']:
+                report['time_to_ready'] = time.perf_counter() - started
+                return report
+            
+            remaining = self.deadline - (time.perf_counter() - started)
+            if remaining <= 0:
+                report['reason'] = f"not ready after {self.deadline:.1f}s"
+                return report
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_delay)
+
+    def _tcp_ready(self, timeout):
+        """Connect to every address of the host at once and remember the first one that accepts"""
+        import select
+        import socket
+        
+        if self._addresses is None:
+            self._addresses = []
+            for host in (self.host,) + (LOOPBACK_HOSTS if self.host == 'localhost' else ()):
+                try:
+                    resolved = socket.getaddrinfo(host, self.port, type=socket.SOCK_STREAM)
+                except OSError:
+                    continue
+                self._addresses.extend(address for address in resolved if address not in self._addresses)
+        pending = {}
+        try:
+            for address in self._addresses:
+                sock = socket.socket(address[0], address[1], address[2])
+                sock.setblocking(False)
+                error = sock.connect_ex(address[4])
+                if error == 0:
+                    self.address = address
+                    pending[sock] = address
+                    return True
+                if error in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    pending[sock] = address
+                else:
+                    sock.close()
+            
+            deadline = time.perf_counter() + timeout
+            waiting = list(pending)
+            while waiting:
+                _, writable, _ = select.select([], waiting, [], max(0, deadline - time.perf_counter()))
+                if not writable:
+                    return False
+                for sock in writable:
+                    waiting.remove(sock)
+                    if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        self.address = pending[sock]
+                        return True
+            return False
+        finally:
+            for sock in pending:
+                sock.close()
+
+    def _http_status(self, timeout):
+        import http.client
+        
+        connection = http.client.HTTPConnection(self.address[4][0], self.port, timeout=timeout)
+        try:
+            connection.request('GET', self.health_path)
+            return connection.getresponse().status
+        except (OSError, http.client.HTTPException):
+            return None
+        finally:
+            connection.close()
+
+
+def sample_session(session_id):
+    """Sum RSS, CPU time and open file descriptors over every process in a session, from /proc
+
+    The application is started in a session of its own, so the wrappers it
+    spawns (`npm start` running node, a shell running python) are counted too.
+    Returns None where /proc is not available.
+    """
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    ticks = os.sysconf('SC_CLK_TCK')
+    sample = {'time': time.monotonic(), 'rss': 0, 'cpu': 0.0, 'fds': 0, 'processes': 0}
+    try:
+        pids = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", 'rb') as f:
+                # The command name may contain spaces and parentheses; the fields start after the last ')'
+                fields = f.read().rsplit(b')', 1)[1].split()
+            if int(fields[3]) != session_id:
+                continue
+            with open(f"/proc/{pid}/statm", 'rb') as f:
+                rss_pages = int(f.read().split()[1])
+            fds = len(os.listdir(f"/proc/{pid}/fd"))
+        except (OSError, IndexError, ValueError):
+            # Exited in the meantime, or owned by another user
+            continue
+        sample['rss'] += rss_pages * page_size
+        sample['cpu'] += (int(fields[11]) + int(fields[12])) / ticks
+        sample['fds'] += fds
+        sample['processes'] += 1
+    return sample
+
+
+def _growth_per_minute(samples, key):
+    """Least-squares slope of a sampled value, per minute"""
+    if len(samples) < 2:
+        return None
+    times = [sample['time'] for sample in samples]
+    values = [sample[key] for sample in samples]
+    mean_time = sum(times) / len(times)
+    mean_value = sum(values) / len(values)
+    variance = sum((t - mean_time) ** 2 for t in times)
+    if not variance:
+        return None
+    return 60 * sum((t - mean_time) * (v - mean_value) for t, v in zip(times, values)) / variance
+
+
+class ProcessSupervisor:
+    """Keeps the application running and watches how heavy it is
+
+    The command is restarted whenever it exits, after a backoff that doubles
+    with every start that did not stay up for `stable_after` seconds and is
+    capped at `max_backoff`. That many quick exits in a row (`crash_loop`) is
+    reported as a crash loop and ends supervision. While a start is running
+    its session is sampled from /proc every `sample_interval` seconds.
+    """
+
+    def __init__(self, command, cwd, port=None, health_path=None, ready_timeout=30.0, sample_interval=1.0,
+                 initial_backoff=0.5, max_backoff=30.0, stable_after=10.0, crash_loop=5, duration=None, env=None):
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.port = port
+        self.health_path = health_path
+        self.ready_timeout = ready_timeout
+        self.sample_interval = sample_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.crash_loop = crash_loop
+        self.duration = duration
+        self.process = None
+
+    def run(self):
+        """Supervise until the duration is over, a crash loop is detected or Ctrl+C; return the report"""
+        import subprocess
+        
+        started = time.monotonic()
+        deadline = started + self.duration if self.duration is not None else None
+        runs = []
+        quick_exits = 0
+        verdict = 'running'
+        try:
+            while True:
+                run = {'started': time.monotonic() - started, 'time_to_ready': None, 'ready': None,
+                       'exit_code': None, 'uptime': None, 'samples': []}
+                runs.append(run)
+                launched = time.monotonic()
+                try:
+                    self.process = subprocess.Popen(self.command, cwd=self.cwd, env=self.env, start_new_session=True)
+                except OSError as e:
+                    run['error'] = str(e)
+                    verdict = 'failed-to-start'
+                    break
+                logger.info(f"Started {' '.join(self.command)} (pid {self.process.pid}, start {len(runs)})")
+                
+                if self.port is not None:
+                    readiness = ReadinessProbe(self.port, health_path=self.health_path, deadline=self.ready_timeout).wait(self.process)
+                    run['ready'] = readiness['ready']
+                    run['time_to_ready'] = readiness['time_to_ready']
+                    if readiness['ready']:
+                        logger.info(f"Ready on port {self.port} after {readiness['time_to_ready']:.2f}s")
+                
+                finished = self._monitor(run, deadline)
+                run['uptime'] = time.monotonic() - launched
+                if finished:
+                    break
+                
+                run['exit_code'] = self.process.returncode
+                quick_exits = quick_exits + 1 if run['uptime'] < self.stable_after else 0
+                if quick_exits >= self.crash_loop:
+                    verdict = 'crash-loop'
+                    logger.error(f"Crash loop: {quick_exits} starts in a row exited within {self.stable_after:.0f}s")
+                    break
+                
+                backoff = min(self.max_backoff, self.initial_backoff * 2 ** max(quick_exits - 1, 0))
+                logger.warning(f"Application exited with code {run['exit_code']} after {run['uptime']:.1f}s, "
+                               f"restarting in {backoff:.1f}s")
+                if deadline is not None and time.monotonic() + backoff >= deadline:
+                    verdict = 'exited'
+                    break
+                time.sleep(backoff)
+        except KeyboardInterrupt:
+            logger.info("Stopping the supervised application")
+            if runs and runs[-1]['uptime'] is None:
+                runs[-1]['uptime'] = time.monotonic() - started - runs[-1]['started']
+        finally:
+            self.stop()
+        
+        return self.report(runs, verdict, time.monotonic() - started)
+
+    def _monitor(self, run, deadline):
+        """Sample the running start until it exits (False) or supervision is over (True)"""
+        import subprocess
+        
+        while True:
+            sample = sample_session(self.process.pid)
+            if sample is not None and sample['processes']:
+                run['samples'].append(sample)
+            timeout = self.sample_interval
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return True
+            try:
+                self.process.wait(timeout=timeout)
+                return False
+            except subprocess.TimeoutExpired:
+                continue
+
+    def stop(self, grace=5.0):
+        """Terminate the whole session of the current start, killing it if it does not exit within `grace`"""
+        import signal
+        import subprocess
+        
+        if self.process is None or self.process.poll() is not None:
+            return
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(self.process.pid, sig)
+            except OSError:
+                self.process.send_signal(sig)
+            try:
+                self.process.wait(timeout=grace)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def report(self, runs, verdict, elapsed):
+        samples = [sample for run in runs for sample in run['samples']]
+        # Growth is measured over the longest start, so restarts do not look like leaks being freed
+        longest = max(runs, key=lambda run: len(run['samples']), default=None)
+        ready_times = [run['time_to_ready'] for run in runs if run['time_to_ready'] is not None]
+        if verdict == 'running':
+            verdict = 'stable' if len(runs) == 1 else 'restarted'
+        return {
+            'command': self.command,
+            'verdict': verdict,
+            'elapsed': elapsed,
+            'starts': len(runs),
+            'restarts': len(runs) - 1,
+            'startup_time': {
+                'first': ready_times[0] if ready_times else None,
+                'median': sorted(ready_times)[len(ready_times) // 2] if ready_times else None,
+                'max': max(ready_times) if ready_times else None,
+            },
+            'memory': {
+                'initial_rss': longest['samples'][0]['rss'] if longest and longest['samples'] else None,
+                'final_rss': longest['samples'][-1]['rss'] if longest and longest['samples'] else None,
+                'peak_rss': max((sample['rss'] for sample in samples), default=None),
+                'rss_growth_per_minute': _growth_per_minute(longest['samples'], 'rss') if longest else None,
+            },
+            'cpu_seconds': sum(run['samples'][-1]['cpu'] for run in runs if run['samples']),
+            'peak_fds': max((sample['fds'] for sample in samples), default=None),
+            'runs': [{key: value for key, value in run.items() if key != 'samples'} for run in runs],
+            'samples': [{'time': sample['time'] - samples[0]['time'], 'rss': sample['rss'], 'cpu': sample['cpu'],
+                         'fds': sample['fds'], 'processes': sample['processes']} for sample in samples],
+        }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list, or None if it is empty"""
+    import math
+    
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(len(sorted_values) * fraction)) - 1]
+
+
+class LoadTester:
+    """Drives concurrent HTTP/1.1 GETs against the launched application for a fixed duration
+
+    Each of the `concurrency` workers takes a connection from a keep-alive pool,
+    sends the next path of the rotation and puts the connection back, so the
+    run measures the application rather than connection setup. Only the local
+    interface is ever targeted. A response with a status of 400 or more counts
+    as an error, like a connection failure or a timeout.
+    """
+
+    def __init__(self, port, paths=('/',), concurrency=10, duration=5.0, timeout=5.0, host='127.0.0.1'):
+        self.host = host
+        self.port = port
+        self.paths = list(paths) or ['/']
+        self.concurrency = max(1, concurrency)
+        self.duration = duration
+        self.timeout = timeout
+
+    def run(self):
+        """Run the load and return its report"""
+        import asyncio
+        
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        import asyncio
+        
+        self.pool = asyncio.Queue()
+        self.connections_opened = 0
+        self.latencies = []
+        self.statuses = {}
+        self.failures = {}
+        self.next_path = 0
+        started = time.perf_counter()
+        deadline = started + self.duration
+        await asyncio.gather(*(self._worker(deadline) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+        while not self.pool.empty():
+            self.pool.get_nowait()[1].close()
+        return self.report(elapsed)
+
+    async def _worker(self, deadline):
+        import asyncio
+        
+        while time.perf_counter() < deadline:
+            path = self.paths[self.next_path % len(self.paths)]
+            self.next_path += 1
+            sent = time.perf_counter()
+            try:
+                status = await self._request(path)
+            except Exception as e:
+                # Connection refused or reset, a timeout or a malformed response
+                reason = type(e).__name__
+                self.failures[reason] = self.failures.get(reason, 0) + 1
+                # Do not spin on a port that refuses every connection
+                await asyncio.sleep(0.01)
+                continue
+            self.latencies.append(time.perf_counter() - sent)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def _request(self, path):
+        import asyncio
+        
+        if self.pool.empty():
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+            self.connections_opened += 1
+        else:
+            reader, writer = self.pool.get_nowait()
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {f'[{self.host}]' if ':' in self.host else self.host}:{self.port}\r\n"
+                         f"User-Agent: replit-fixer\r\nAccept: */*\r\n\r\n".encode('latin-1'))
+            status, keep_alive = await asyncio.wait_for(self._read_response(reader), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self.pool.put_nowait((reader, writer))
+        else:
+            writer.close()
+        return status
+
+    @staticmethod
+    async def _read_response(reader):
+        """Read one response, body included, and return (status, whether the connection can be reused)"""
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(' ', 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif int(status) not in (204, 304) and not 100 <= int(status) < 200:
+            # No framing: the body runs until the server closes the connection
+            await reader.read()
+            keep_alive = False
+        return int(status), keep_alive
+
+    def report(self, elapsed):
+        latencies = sorted(self.latencies)
+        failed = sum(self.failures.values())
+        errors = failed + sum(count for status, count in self.statuses.items() if status >= 400)
+        total = len(latencies) + failed
+        return {
+            'host': self.host,
+            'port': self.port,
+            'paths': self.paths,
+            'concurrency': self.concurrency,
+            'duration': elapsed,
+            'requests': total,
+            'throughput': len(latencies) / elapsed if elapsed else None,
+            'error_rate': errors / total if total else None,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'failures': self.failures,
+            'connections_opened': self.connections_opened,
+            'latency': {
+                'p50': percentile(latencies, 0.50),
+                'p95': percentile(latencies, 0.95),
+                'p99': percentile(latencies, 0.99),
+                'max': latencies[-1] if latencies else None,
+            },
+        }
+
+
+def load_test_failures(report, max_error_rate=None, max_p95=None, max_p99=None, min_throughput=None):
+    """Return the thresholds a load test report misses, as human-readable reasons"""
+    reasons = []
+    if not report['requests']:
+        return ["no requests completed"]
+    if max_error_rate is not None and report['error_rate'] > max_error_rate:
+        reasons.append(f"error rate {report['error_rate']:.1%} above {max_error_rate:.1%}")
+    for name, limit in (('p95', max_p95), ('p99', max_p99)):
+        value = report['latency'][name]
+        if limit is not None and value is not None and value > limit:
+            reasons.append(f"{name} latency {value * 1000:.1f}ms above {limit * 1000:.0f}ms")
+    if min_throughput is not None and report['throughput'] < min_throughput:
+        reasons.append(f"throughput {report['throughput']:.1f} req/s below {min_throughput:.1f}")
+    return reasons
+
+
+class Instrumentation:
+    """Per-phase metrics collector; this base class is the disabled, do-nothing version
+
+    Call sites always go through phase() and count(), so turning
+    instrumentation off costs one method call that returns immediately.
+    """
+
+    enabled = False
+    _NULL_PHASE = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._NULL_PHASE
+
+    def count(self, counter, amount=1):
+        pass
+
+    def subprocess(self, name, seconds):
+        pass
+
+    def report(self):
+        return None
+
+
+class PhaseRecorder(Instrumentation):
+    """Records wall/CPU time, I/O counters, subprocess durations and peak RSS per phase
+
+    `sources` is a callable returning cumulative counters (such as bytes read by
+    the content store); the recorder attributes their growth to the phase that
+    was running. With a profile path every phase runs under cProfile and the
+    stats of the slowest one are dumped there by finish().
+    """
+
+    enabled = True
+
+    def __init__(self, sources=None, profile_path=None):
+        self.sources = sources or (lambda: {})
+        self.profile_path = profile_path
+        self.phases = OrderedDict()
+        self._current = None
+        self._profiles = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        import resource
+        
+        record = self.phases.setdefault(name, {
+            'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'files_visited': 0, 'files_read': 0,
+            'bytes_read': 0, 'content_cache_hits': 0, 'regex_evaluations': 0, 'subprocesses': [], 'peak_rss_kb': 0,
+        })
+        previous, self._current = self._current, record
+        before = self.sources()
+        profiler = None
+        if self.profile_path:
+            import cProfile
+            profiler = self._profiles.setdefault(name, cProfile.Profile())
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_seconds'] += time.perf_counter() - wall_started
+            record['cpu_seconds'] += time.process_time() - cpu_started
+            for counter, value in self.sources().items():
+                record[counter] = record.get(counter, 0) + value - before.get(counter, 0)
+            # ru_maxrss is the high-water mark so far, in KiB on Linux
+            record['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            record['children_peak_rss_kb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self._current = previous
+
+    def count(self, counter, amount=1):
+        if self._current is not None:
+            self._current[counter] = self._current.get(counter, 0) + amount
+
+    def subprocess(self, name, seconds):
+        if self._current is not None:
+            self._current['subprocesses'].append({'name': name, 'seconds': seconds})
+
+    def hottest_phase(self):
+        """Return the name of the phase with the most wall time"""
+        if not self.phases:
+            return None
+        return max(self.phases, key=lambda name: self.phases[name]['wall_seconds'])
+
+    def finish(self):
+        """Dump the profile of the hottest phase if profiling was requested"""
+        hottest = self.hottest_phase()
+        if self.profile_path and hottest in self._profiles:
+            self._profiles[hottest].dump_stats(self.profile_path)
+            logger.info(f"Wrote cProfile stats for the {hottest} phase to {self.profile_path}")
+
+    def report(self):
+        totals = {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'files_visited': 0, 'files_read': 0,
+                  'bytes_read': 0, 'content_cache_hits': 0, 'regex_evaluations': 0, 'subprocess_seconds': 0.0,
+                  'peak_rss_kb': 0}
+        for record in self.phases.values():
+            for counter in totals:
+                if counter == 'subprocess_seconds':
+                    totals[counter] += sum(entry['seconds'] for entry in record['subprocesses'])
+                elif counter == 'peak_rss_kb':
+                    totals[counter] = max(totals[counter], record['peak_rss_kb'])
+                else:
+                    totals[counter] += record.get(counter, 0)
+        return {
+            'phases': self.phases,
+            'total': totals,
+            'hottest_phase': self.hottest_phase(),
+            'profile': self.profile_path if self.profile_path and self._profiles else None,
+        }
+
+
+def _gitignore_regex(pattern):
+    # Translate one gitignore pattern (without negation or trailing slash) into a regex body
+    anchored = '/' in pattern
+    pattern = pattern[1:] if pattern.startswith('/') else pattern
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('/.*')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        char = pattern[i]
+        if char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                out.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ('' if anchored else '(?:.*/)?') + ''.join(out)
+
+
+class IgnoreRules:
+    """The rules of one .gitignore-style file compiled into a single regex per entry kind
+
+    Rules are joined into one alternation in reverse order, so the first
+    alternative that matches is the last rule in the file, which is the one git
+    honours. Paths are matched relative to the directory holding the file.
+    """
+
+    def __init__(self, lines):
+        rules = []
+        for line in lines:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip() if not line.endswith('\\ ') else line
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            directory_only = line.endswith('/')
+            line = line.rstrip('/')
+            if line:
+                rules.append((_gitignore_regex(line), negated, directory_only))
+        self.rule_count = len(rules)
+        self._matchers = {
+            True: self._compile(list(reversed(rules))),
+            False: self._compile([rule for rule in reversed(rules) if not rule[2]]),
+        }
+
+    @staticmethod
+    def _compile(rules):
+        if not rules:
+            return None
+        pattern = re.compile('(?:' + '|'.join(f"({regex})" for regex, _, _ in rules) + ')$')
+        return pattern, [negated for _, negated, _ in rules]
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir):
+        """Return True if ignored, False if explicitly re-included, None if no rule applies"""
+        matcher = self._matchers[is_dir]
+        if matcher is None:
+            return None
+        pattern, negations = matcher
+        match = pattern.match(rel_path)
+        if match is None:
+            return None
+        return not negations[match.lastindex - 1]
+
+
+class RepoWalker:
+    """Top-down directory walker that prunes before descending
+
+    Built on os.scandir so the type and stat data of each DirEntry are reused
+    instead of being looked up again. Directories excluded by .gitignore or
+    .replitignore rules, dependency and cache directories, and build output
+    directories are never entered. Pruned build directories are remembered so
+    later checks can still find the shipped assets.
+    """
+
+    def __init__(self, root, skipped=SKIPPED_DIRECTORIES, generated=GENERATED_DIRECTORIES):
+        self.root = root
+        self.skipped = set(skipped)
+        self.generated = set(generated)
+        self.build_directories = []
+        self.ignored = 0
+
+    def walk(self):
+        """Yield (rel_dir, file DirEntries) for every directory that is not pruned, in sorted order"""
+        exclude = IgnoreRules.from_file(os.path.join(self.root, '.git', 'info', 'exclude'))
+        stack = [(self.root, '', [('', exclude)] if exclude else [])]
+        while stack:
+            directory, rel_dir, rules = stack.pop()
+            # Sorted so every way of listing a directory yields the same order
+            entries = sorted(self._list(directory, rel_dir), key=lambda entry: entry.name)
+            
+            names = {entry.name for entry in entries}
+            for ignore_file in IGNORE_FILES:
+                if ignore_file in names:
+                    parsed = IgnoreRules.from_file(os.path.join(directory, ignore_file))
+                    if parsed is not None and parsed.rule_count:
+                        rules = rules + [(rel_dir, parsed)]
+            
+            files = []
+            subdirectories = []
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and entry.name in self.skipped:
+                    continue
+                if is_dir and entry.name in self.generated:
+                    # Recorded before ignore rules apply: build output is usually gitignored, yet it is what ships
+                    self.build_directories.append(rel_path)
+                    continue
+                if self._ignored(rel_path, is_dir, rules):
+                    self.ignored += 1
+                    continue
+                if is_dir:
+                    subdirectories.append((entry.path, rel_path, rules))
+                elif entry.is_file():
+                    files.append(entry)
+            
+            yield rel_dir, files
+            # Reversed so the stack pops them in listing order, like os.walk()
+            stack.extend(reversed(subdirectories))
+
+    def _list(self, directory, rel_dir):
+        try:
+            with os.scandir(directory) as iterator:
+                return list(iterator)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _ignored(rel_path, is_dir, rules):
+        # Deeper ignore files override shallower ones
+        for base, parsed in reversed(rules):
+            relative = rel_path[len(base) + 1:] if base else rel_path
+            decision = parsed.match(relative, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+
+def read_git_index(path):
+    """Parse a git index file (versions 2 to 4) into a list of (path, mode) for the checked-out entries
+
+    Only what is needed to enumerate the work tree is decoded: unmerged stages
+    other than 0 and skip-worktree entries are dropped. Raises ValueError for
+    anything this reader cannot represent faithfully, such as split or sparse
+    indexes, so callers can fall back to walking the directory.
+    """
+    import struct
+    
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 32 or data[:4] != b'DIRC':
+        raise ValueError("not a git index")
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3, 4):
+        raise ValueError(f"unsupported git index version {version}")
+
+    # Only the mode and flags of each fixed-size entry header matter here
+    entry_header = struct.Struct('>24xI32xH')
+    entries = []
+    position = 12
+    previous = b''
+    for _ in range(count):
+        mode, flags = entry_header.unpack_from(data, position)
+        header = 62
+        skip_worktree = False
+        if version >= 3 and flags & 0x4000:
+            skip_worktree = bool(data[position + 62] & 0x40)
+            header += 2
+
+        if version == 4:
+            # Path compressed against the previous one: strip N bytes, then append a NUL-terminated suffix
+            cursor = position + header
+            byte = data[cursor]
+            strip = byte & 0x7f
+            while byte & 0x80:
+                cursor += 1
+                byte = data[cursor]
+                strip = ((strip + 1) << 7) | (byte & 0x7f)
+            end = data.index(b'\0', cursor + 1)
+            name = previous[:len(previous) - strip] + data[cursor + 1:end]
+            position = end + 1
+        else:
+            end = data.index(b'\0', position + header)
+            name = data[position + header:end]
+            position += (header + len(name) + 8) & ~7
+        previous = name
+
+        if mode >> 12 == 0o04:
+            raise ValueError("sparse index directory entries are not supported")
+        if (flags >> 12) & 3 or skip_worktree:
+            continue
+        entries.append((name.decode('utf-8', 'surrogateescape'), mode))
+
+    # Extensions follow the entries; a split index keeps most entries in another file
+    while position + 8 <= len(data) - 20:
+        signature = data[position:position + 4]
+        size = struct.unpack_from('>I', data, position + 4)[0]
+        if signature in (b'link', b'sdir'):
+            raise ValueError(f"git index extension {signature.decode()} is not supported")
+        position += 8 + size
+    return entries
+
+
+class _ListedEntry:
+    """DirEntry stand-in for files and directories known without listing their parent"""
+
+    __slots__ = ('name', 'path', '_kind', '_stat')
+
+    def __init__(self, name, path, kind):
+        self.name = name
+        self.path = path
+        self._kind = kind
+        self._stat = None
+
+    def is_dir(self, follow_symlinks=True):
+        return self._kind == 'd'
+
+    def is_file(self, follow_symlinks=True):
+        # Symlinks are resolved the way DirEntry.is_file() resolves them
+        return self._kind == 'f' or (self._kind == 'l' and os.path.isfile(self.path))
+
+    def stat(self, follow_symlinks=True):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+class GitIndexWalker(RepoWalker):
+    """RepoWalker that takes directory listings from the git index where it can
+
+    A directory is listed from the index when it has not been modified since the
+    index was written and a previous scan recorded its untracked entries under
+    the same index; only a stat of the directory itself is needed then. Every
+    other directory, including ones with no tracked files, is read from disk and
+    its untracked entries are recorded for the next run. Pruning and ignore
+    rules are shared with RepoWalker, so both produce the same file lists.
+    """
+
+    def __init__(self, root, records_path, **kwargs):
+        super().__init__(root, **kwargs)
+        index_path = os.path.join(root, '.git', 'index')
+        index_stat = os.stat(index_path)
+        self.index_mtime_ns = index_stat.st_mtime_ns
+        self.identity = [index_stat.st_size, index_stat.st_mtime_ns]
+        # On filesystems with whole-second timestamps a directory touched in the same second as the index is ambiguous
+        self.granularity_ns = 1000 * 1000 * 1000 if index_stat.st_mtime_ns % (1000 * 1000 * 1000) == 0 else 1
+        self.tree = {}
+        for path, mode in read_git_index(index_path):
+            if os.sep != '/':
+                path = path.replace('/', os.sep)
+            parent, _, name = path.rpartition(os.sep)
+            children = self.tree.get(parent)
+            if children is None:
+                children = self.tree[parent] = {}
+                # Register the new directory with each ancestor that is not known yet
+                child = parent
+                while child:
+                    grandparent, _, child_name = child.rpartition(os.sep)
+                    siblings = self.tree.get(grandparent)
+                    if siblings is not None:
+                        siblings[child_name] = 'd'
+                        break
+                    self.tree[grandparent] = {child_name: 'd'}
+                    child = grandparent
+            # Submodules are listed as directories and read from disk since the index has none of their files
+            children[name] = {0o12: 'l', 0o16: 'd'}.get(mode >> 12, 'f')
+        self.records_path = records_path
+        self.records = self._load_records()
+        self.records_dirty = False
+        self.listed_from_index = 0
+        self.listed_from_disk = 0
+
+    def _load_records(self):
+        try:
+            with open(self.records_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Untracked entries recorded against another index may since have been added or removed
+        return data.get('directories', {}) if data.get('index') == self.identity else {}
+
+    def _list(self, directory, rel_dir):
+        children = self.tree.get(rel_dir)
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        record = self.records.get(rel_dir)
+        if (children is not None and record is not None and record[0] == mtime_ns
+                and mtime_ns + self.granularity_ns <= self.index_mtime_ns):
+            self.listed_from_index += 1
+            names = dict(children)
+            names.update(record[1])
+            prefix = directory + os.sep
+            return [_ListedEntry(name, prefix + name, kind) for name, kind in names.items()]
+
+        self.listed_from_disk += 1
+        entries = super()._list(directory, rel_dir)
+        untracked = {}
+        for entry in entries:
+            if children is None or entry.name not in children or (children[entry.name] == 'd') != entry.is_dir(follow_symlinks=False):
+                untracked[entry.name] = 'd' if entry.is_dir(follow_symlinks=False) else ('l' if entry.is_symlink() else 'f')
+        self.records[rel_dir] = [mtime_ns, untracked]
+        self.records_dirty = True
+        return entries
+
+    def save(self):
+        """Persist the untracked entries seen in directories read from disk"""
+        if not self.records_dirty:
+            return
+        try:
+            make_cache_directory(self.records_path)
+            tmp_path = f"{self.records_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'index': self.identity, 'directories': self.records}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.records_path)
+        except OSError as e:
+            logger.warning(f"Could not write directory records: {str(e)}")
+
+
+def generated_bundle_reason(entry):
+    """Return why a JavaScript DirEntry looks like build output, or None if it looks like source"""
+    name = entry.name
+    if name.endswith(('.min.js', '.bundle.js')):
+        return "minified file name"
+    try:
+        size = entry.stat().st_size
+    except OSError:
+        return None
+    if size > MAX_SOURCE_FILE_SIZE:
+        return f"{size} bytes"
+    # Ordinary sources such as api-v2Client.js look hashed too, so a hashed name only
+    # decides once the content turns out to be minified as well
+    hashed = HASHED_BUNDLE_NAME.search(name) is not None
+    if size <= SAMPLE_THRESHOLD and not hashed:
+        return None
+    
+    # Hand-written code has short lines and plenty of whitespace; minified output has neither
+    try:
+        with open(entry.path, 'rb') as f:
+            sample = f.read(4096)
+    except OSError:
+        return None
+    lines = sample.count(b'\n') + 1
+    whitespace = sum(sample.count(char) for char in (b' ', b'\t', b'\n'))
+    if len(sample) / lines > 300 or whitespace / max(len(sample), 1) < 0.05:
+        return "minified content-hashed bundle" if hashed else "minified content"
+    return None
+
+
+def content_hashed(name):
+    """Return whether a bundle file name carries a content hash, so it can be cached forever"""
+    return bool(HASHED_BUNDLE_NAME.search(name) or BASE64_BUNDLE_HASH.search(name))
+
+
+def _load_brotli():
+    """Return a module providing brotli's compress(), or None when no binding is installed"""
+    import importlib
+    
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            return importlib.import_module(module)
+        except ImportError:
+            continue
+    return None
+
+
+def compress_asset(root, rel_path, encodings, write=False):
+    """Compress one asset with every encoding and return its raw and compressed sizes, or None if it cannot be read
+
+    Runs in process pool workers. With write, each compressed copy is also
+    stored next to the asset under the encoding's suffix, through a temporary
+    file and a rename, and given the asset's timestamps so it reads as up to
+    date until the asset changes again.
+    """
+    path = os.path.join(root, rel_path)
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    
+    sizes = {'size': len(data)}
+    for encoding in encodings:
+        if encoding == 'gzip':
+            import gzip
+            # A fixed header timestamp keeps the output byte-for-byte reproducible
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = _load_brotli().compress(data, quality=11)
+        sizes[encoding] = len(compressed)
+        if not write:
+            continue
+        
+        target = path + PRECOMPRESSED_SUFFIXES[encoding]
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp_path, target)
+        except OSError as e:
+            sizes.setdefault('errors', {})[rel_path + PRECOMPRESSED_SUFFIXES[encoding]] = str(e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+    return sizes
+
+
+class FixPlan:
+    """Edits planned by the fixes, merged per file and applied with one atomic write per file
+
+    Every edit is a byte range of a file as it was when the fix was planned, so
+    fixes never depend on each other's output. A file that changed on disk since
+    then is left alone rather than patched at the wrong offsets, and a file the
+    edits leave byte-for-byte identical is not written at all.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.directories = []
+        self.notes = []
+
+    def edit(self, rel_path, base, start, end, replacement):
+        """Replace bytes start:end of `base`, the current content of rel_path (None for a file to create)"""
+        planned = self.files.setdefault(rel_path, {'base': base, 'edits': []})
+        if planned['base'] != base:
+            raise ValueError(f"Edits to {rel_path} were planned against different contents")
+        planned['edits'].append((start, end, replacement))
+
+    def create(self, rel_path, content):
+        """Create rel_path with the given text; an existing file is never overwritten"""
+        self.edit(rel_path, None, 0, 0, content.encode('utf-8'))
+
+    def directory(self, rel_path):
+        """Create a directory, even if no planned file ends up in it"""
+        self.directories.append(rel_path)
+
+    def describe(self, rel_path, description):
+        """Record the message reported once the edits to rel_path have been written"""
+        self.notes.append((rel_path, description))
+
+    def descriptions(self, written):
+        return [description for rel_path, description in self.notes if rel_path in written]
+
+    def render(self, rel_path):
+        """Return the new content of rel_path with all of its edits merged"""
+        planned = self.files[rel_path]
+        base = planned['base'] or b''
+        parts = []
+        position = 0
+        # Sorting is stable, so insertions at the same offset keep the order they were planned in
+        for start, end, replacement in sorted(planned['edits'], key=lambda edit: (edit[0], edit[1])):
+            if start < position:
+                logger.warning(f"Skipping an overlapping edit to {rel_path} at byte {start}")
+                continue
+            parts.append(base[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(base[position:])
+        return b''.join(parts)
+
+    def diff(self):
+        """Return the plan as unified diffs against the planned-from contents"""
+        import difflib
+        
+        chunks = []
+        for rel_path in sorted(self.files):
+            base = self.files[rel_path]['base']
+            before = (base or b'').decode('utf-8', 'replace').splitlines(keepends=True)
+            after = self.render(rel_path).decode('utf-8', 'replace').splitlines(keepends=True)
+            for line in difflib.unified_diff(before, after, '/dev/null' if base is None else f"a/{rel_path}", f"b/{rel_path}"):
+                chunks.append(line if line.endswith('\n') else line + "\n\\ No newline at end of file\n")
+        return ''.join(chunks)
+
+    def apply(self, root):
+        """Write every changed file through a temporary file and a rename; return the rel_paths written"""
+        for rel_path in self.directories:
+            os.makedirs(os.path.join(root, rel_path), exist_ok=True)
+        
+        written = []
+        for rel_path, planned in self.files.items():
+            path = os.path.join(root, rel_path)
+            try:
+                with open(path, 'rb') as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            if current != planned['base']:
+                logger.warning(f"Not fixing {rel_path}: it changed since the fixes were planned")
+                continue
+            
+            content = self.render(rel_path)
+            if content == current:
+                continue
+            os.makedirs(os.path.dirname(path) or root, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                if current is not None:
+                    os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Could not write {rel_path}: {str(e)}")
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                continue
+            written.append(rel_path)
+        return written
+
+
+# Files whose changes can alter a watch-mode verdict; anything else is not re-diagnosed
+WATCHED_SUFFIXES = ('.py', '.js', '.html')
+WATCHED_NAMES = frozenset({'.replit', 'package.json', 'requirements.txt', 'pyproject.toml', 'poetry.lock', 'replit.nix'}) | frozenset(IGNORE_FILES)
+
+
+class InotifyWatcher:
+    """Directory watcher on Linux inotify, called through ctypes"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    STRUCTURAL = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    MASK = IN_CLOSE_WRITE | STRUCTURAL | IN_ONLYDIR
+
+    def __init__(self, root):
+        import ctypes
+        import ctypes.util
+        
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        self.descriptors = {}
+
+    def watch(self, rel_dirs, rel_files=()):
+        """Watch exactly the given directories and return the ones that were not watched before"""
+        wanted = set(rel_dirs)
+        for rel_dir in list(self.directories):
+            if rel_dir not in wanted:
+                self.libc.inotify_rm_watch(self.fd, self.directories.pop(rel_dir))
+        added = []
+        for rel_dir in wanted - set(self.directories):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(os.path.join(self.root, rel_dir)), self.MASK)
+            if wd >= 0:
+                self.directories[rel_dir] = wd
+                self.descriptors[wd] = rel_dir
+                added.append(rel_dir)
+        return added
+
+    def changes(self, timeout=None):
+        """Wait up to `timeout` seconds (forever for None) and return [(rel_path, structural, is_dir)]"""
+        import select
+        import struct
+        
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        changes = []
+        position = 0
+        while position + 16 <= len(data):
+            wd, mask, _, length = struct.unpack_from('iIII', data, position)
+            name = data[position + 16:position + 16 + length].rstrip(b'\0')
+            position += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost, so everything has to be looked at again
+                changes.append(('', True, True))
+                continue
+            rel_dir = self.descriptors.get(wd)
+            if mask & self.IN_IGNORED:
+                self.descriptors.pop(wd, None)
+                if rel_dir is not None and self.directories.get(rel_dir) == wd:
+                    del self.directories[rel_dir]
+                continue
+            if rel_dir is None:
+                continue
+            rel_path = os.path.join(rel_dir, os.fsdecode(name)) if name else rel_dir
+            changes.append((rel_path, bool(mask & self.STRUCTURAL), bool(mask & self.IN_ISDIR) or not name))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher that compares directory and file stats at a fixed interval"""
+
+    def __init__(self, root, interval=0.5):
+        self.root = root
+        self.interval = interval
+        self.snapshot = {}
+        self.last_poll = time.monotonic()
+
+    def _stat(self, rel_path):
+        try:
+            st = os.stat(os.path.join(self.root, rel_path))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def watch(self, rel_dirs, rel_files=()):
+        """Watch the given directories for entries coming and going and the given files for edits; return new directories"""
+        previous = self.snapshot
+        self.snapshot = {}
+        for rel_dir in rel_dirs:
+            self.snapshot[rel_dir] = (True, self._stat(rel_dir))
+        for rel_path in rel_files:
+            self.snapshot[rel_path] = (False, self._stat(rel_path))
+        return [rel_dir for rel_dir in rel_dirs if rel_dir not in previous]
+
+    def changes(self, timeout=None):
+        """Wait up to `timeout` seconds (forever for None) and return [(rel_path, structural, is_dir)]"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            next_poll = self.last_poll + self.interval
+            if deadline is not None and next_poll > deadline:
+                # No poll is due before the deadline, so there is nothing new to report
+                time.sleep(max(0, deadline - time.monotonic()))
+                return []
+            time.sleep(max(0, next_poll - time.monotonic()))
+            
+            self.last_poll = time.monotonic()
+            changes = []
+            for rel_path, (is_dir, previous) in self.snapshot.items():
+                current = self._stat(rel_path)
+                if current != previous:
+                    self.snapshot[rel_path] = (is_dir, current)
+                    # A directory's mtime only moves when entries are added, removed or renamed
+                    changes.append((rel_path, is_dir or current is None, is_dir))
+            if changes or deadline is not None:
+                return changes
+
+    def close(self):
+        pass
+
+
+def issue_diff(previous, current):
+    """Return (new, resolved, unchanged) issue lists, keeping each list in report order"""
+    previous_set = set(previous)
+    current_set = set(current)
+    new = [issue for issue in current if issue not in previous_set]
+    resolved = [issue for issue in previous if issue not in current_set]
+    unchanged = [issue for issue in current if issue in previous_set]
+    return new, resolved, unchanged
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
-logger = logging.getLogger("ReplitFixer")
 
 class ReplitFixer:
-    def __init__(self):
+    def __init__(self, root=None, use_cache=True, jobs=1, install_concurrency=4, install_timeout=900,
+                 ready_timeout=30.0, health_path=None, metrics=None, use_git_index=True, load_test=None,
+                 compress_jobs=0, read_only=False):
         self.issues = []
         self.fixes_applied = []
-        self.repl_directory = os.getcwd()
+        self.repl_directory = os.path.abspath(root) if root is not None else os.getcwd()
         self.root_files = []
         self.python_files = []
         self.js_files = []
         self.html_files = []
         self.package_json = None
+        self.package_json_files = []
+        self.generated_files = []
+        self.build_directories = []
+        self.directories = []
+        self._entries = {}
         self.requirements_txt = None
         self.pyproject_toml = None
         self.poetry_lock = None
@@ -44,35 +2319,72 @@ class ReplitFixer:
         self.has_fastapi = False
         self.has_nodejs = False
         self.has_react = False
+        self.detected_frameworks = []
         self.fixed_error = False
+        self.files = FileContentStore(self.repl_directory)
+        # Read-only runs (fix --dry-run) still use the cache but leave the repository untouched
+        self.read_only = read_only
+        self.manifest = (ScanManifest(os.path.join(self.repl_directory, CACHE_DIR, 'manifest.json'), read_only=read_only)
+                         if use_cache else None)
+        self.python_index = None
+        self.python_install_report = None
+        self.npm_install_report = None
+        self.install_results = None
+        self.install_concurrency = install_concurrency
+        self.install_timeout = install_timeout
+        self.ready_timeout = ready_timeout
+        self.health_path = health_path
+        self.readiness = None
+        self.supervision = None
+        self.load_test = load_test
+        self.load_report = None
+        self.asset_report = None
+        self.stale_assets = []
+        self.dry_run_diff = None
+        self.metrics = metrics or Instrumentation()
+        self.use_git_index = use_git_index
+        if self.metrics.enabled and isinstance(self.metrics, PhaseRecorder):
+            self.metrics.sources = lambda: {'bytes_read': self.files.bytes_read, 'files_read': self.files.misses,
+                                            'content_cache_hits': self.files.hits}
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        # Precompression is CPU-bound and worth a process per core even when analysis runs serially
+        self.compress_jobs = compress_jobs if compress_jobs > 0 else (os.cpu_count() or 1)
         
     def scan_directory(self):
         """Scan the directory structure to identify important files"""
         logger.info("🔍 Scanning directory structure...")
         
-        for root, dirs, files in os.walk(self.repl_directory):
-            # Skip node_modules, __pycache__, and .git directories
-            dirs[:] = [d for d in dirs if d not in ('node_modules', '__pycache__', '.git', 'venv', '.venv')]
+        walker = self._walker()
+        visited = 0
+        for rel_dir, entries in walker.walk():
+            visited += len(entries)
+            self.directories.append(rel_dir)
             
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, self.repl_directory)
+            for entry in entries:
+                file = entry.name
+                rel_path = os.path.join(rel_dir, file) if rel_dir else file
                 
                 # Get the root level files
-                if root == self.repl_directory:
+                if not rel_dir:
                     self.root_files.append(file)
                 
                 # Categorize by file extension
                 if file.endswith('.py'):
                     self.python_files.append(rel_path)
-                elif file.endswith('.js') and not file.endswith('.min.js'):
-                    self.js_files.append(rel_path)
+                    self._entries[rel_path] = entry
+                elif file.endswith('.js'):
+                    reason = generated_bundle_reason(entry)
+                    if reason is None:
+                        self.js_files.append(rel_path)
+                    else:
+                        self.generated_files.append(rel_path)
+                        logger.debug(f"Skipping generated {rel_path} ({reason})")
                 elif file.endswith('.html'):
                     self.html_files.append(rel_path)
                 
                 # Check for specific config files
                 if file == 'package.json':
-                    self.package_json = rel_path
+                    self.package_json_files.append(rel_path)
                 elif file == 'requirements.txt':
                     self.requirements_txt = rel_path
                 elif file == 'pyproject.toml':
@@ -82,50 +2394,259 @@ class ReplitFixer:
                 elif file == 'replit.nix':
                     self.replit_nix = rel_path
         
+        self.build_directories = walker.build_directories
+        if isinstance(walker, GitIndexWalker):
+            if not self.read_only:
+                walker.save()
+            logger.info(f"Enumerated files from the git index ({walker.listed_from_index} directories from the index, "
+                        f"{walker.listed_from_disk} read from disk)")
+        if walker.build_directories or self.generated_files:
+            logger.info(f"Skipped {len(walker.build_directories)} build output directories and "
+                        f"{len(self.generated_files)} generated bundles")
+        self.metrics.count('files_visited', visited)
+        
+        # The shallowest package.json stands for the project; every one is kept for installs
+        self.package_json_files.sort(key=lambda path: (path.count(os.sep), path))
+        self.package_json = self.package_json_files[0] if self.package_json_files else None
+        
         logger.info(f"Found {len(self.python_files)} Python files, {len(self.js_files)} JavaScript files, and {len(self.html_files)} HTML files")
+    
+    def _reset_inventory(self):
+        self.root_files = []
+        self.python_files = []
+        self.js_files = []
+        self.html_files = []
+        self.package_json = None
+        self.package_json_files = []
+        self.generated_files = []
+        self.build_directories = []
+        self.directories = []
+        self._entries = {}
+        self.requirements_txt = None
+        self.pyproject_toml = None
+        self.poetry_lock = None
+        self.replit_nix = None
+    
+    def _reset_verdict(self):
+        self.issues = []
+        self.has_flask = False
+        self.has_django = False
+        self.has_fastapi = False
+        self.has_nodejs = False
+        self.has_react = False
+        self.detected_frameworks = []
+    
+    def _walker(self):
+        """Use the git index to enumerate files when possible, falling back to a plain directory walk"""
+        if self.manifest is not None and self.use_git_index and os.path.isfile(os.path.join(self.repl_directory, '.git', 'index')):
+            try:
+                return GitIndexWalker(self.repl_directory, os.path.join(self.repl_directory, CACHE_DIR, 'directories.json'))
+            except (OSError, ValueError, IndexError) as e:
+                logger.info(f"Not using the git index ({str(e)}), walking the directory instead")
+        return RepoWalker(self.repl_directory)
+    
+    def npm_trees(self):
+        """Group package.json files into install roots, each with the workspace members it installs"""
+        import fnmatch
+        
+        directories = [os.path.dirname(path) for path in self.package_json_files]
+        trees = OrderedDict()
+        for directory in directories:
+            try:
+                with open(os.path.join(self.repl_directory, directory, 'package.json'), 'r') as f:
+                    patterns = workspace_patterns(json.load(f))
+            except (OSError, ValueError):
+                patterns = []
+            members = []
+            for other in directories:
+                relative = os.path.relpath(other or '.', directory or '.')
+                if other != directory and not relative.startswith('..') and any(fnmatch.fnmatch(relative, pattern) for pattern in patterns):
+                    members.append(relative)
+            trees[directory] = members
+        
+        # Workspace members are installed by their workspace root
+        member_directories = {os.path.normpath(os.path.join(directory, member)) for directory, members in trees.items() for member in members}
+        return OrderedDict((directory, members) for directory, members in trees.items() if directory not in member_directories)
+    
+    def index_python_files(self):
+        """Index every Python file once, reusing manifest indexes for unchanged content"""
+        if self.python_index is not None:
+            return self.python_index
+        
+        if self.manifest is not None:
+            self.manifest.load()
+        
+        # Work out which files need reading before indexing any of them, so the
+        # pending set can be handed to the process pool in one go
+        stats = {}
+        cached = {}
+        pending = []
+        for py_file in self.python_files:
+            try:
+                # The walker's DirEntry has already paid for the stat
+                entry = self._entries.get(py_file)
+                st = entry.stat() if entry is not None else os.stat(os.path.join(self.repl_directory, py_file))
+            except OSError:
+                continue
+            stats[py_file] = st
+            entry = self.manifest.lookup(py_file, st) if self.manifest is not None else None
+            if entry is not None:
+                cached[py_file] = self.manifest.index_for(entry['hash'])
+            else:
+                pending.append(py_file)
+        
+        if self.jobs > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            results = self._index_parallel(pending)
+        else:
+            results = {py_file: self._index_one(py_file) for py_file in pending}
+        
+        # Merge in python_files order so flags and issues come out exactly as in serial mode
+        self.python_index = {}
+        added = changed = 0
+        for py_file in self.python_files:
+            if py_file in cached:
+                self.python_index[py_file] = cached[py_file]
+                continue
+            result = results.get(py_file)
+            if result is None:
+                continue
+            
+            digest, index = result
+            previous = self.manifest.entries.get(py_file) if self.manifest is not None else None
+            if previous is None:
+                added += 1
+            elif digest is None or previous.get('hash') != digest:
+                changed += 1
+            
+            # Binary files are remembered too so they are not re-read on the next run
+            self.python_index[py_file] = index
+            if self.manifest is not None:
+                self.manifest.record(py_file, stats[py_file], digest, index)
+        
+        self.metrics.count('files_indexed', len(pending))
+        if self.manifest is not None:
+            deleted = len(self.manifest.prune(set(self.python_index)))
+            self.manifest.save()
+            logger.info(f"Indexed {added + changed} of {len(self.python_index)} Python files "
+                        f"({added} added, {changed} changed, {deleted} deleted since the last run)")
+        
+        return self.python_index
+    
+    def refresh_python_index(self, changed):
+        """Re-index the changed Python files and keep the in-memory index of every other file"""
+        previous = self.python_index or {}
+        self.python_index = {}
+        indexed = 0
+        for py_file in self.python_files:
+            if py_file in previous and py_file not in changed:
+                self.python_index[py_file] = previous[py_file]
+                continue
+            
+            indexed += 1
+            self.files.invalidate(py_file)
+            result = self._index_one(py_file)
+            if result is None:
+                continue
+            digest, index = result
+            self.python_index[py_file] = index
+            if self.manifest is not None:
+                try:
+                    self.manifest.record(py_file, os.stat(os.path.join(self.repl_directory, py_file)), digest, index)
+                except OSError:
+                    pass
+        self.metrics.count('files_indexed', indexed)
+        return self.python_index
+    
+    def _index_one(self, py_file):
+        try:
+            content = self.files.read(py_file)
+        except UnicodeDecodeError:
+            return None, None
+        except OSError:
+            return None
+        digest = content_digest(content.encode('utf-8'))
+        # Identical content seen before (a copy, a rename or a touch) reuses its index
+        index = self.manifest.index_for(digest) if self.manifest is not None else None
+        return digest, index if index is not None else build_python_index(content)
+    
+    def _index_parallel(self, pending):
+        from concurrent.futures import ProcessPoolExecutor
+        
+        chunk_size = max(1, min(PARALLEL_CHUNK_SIZE, -(-len(pending) // (self.jobs * 4))))
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        logger.info(f"Indexing {len(pending)} Python files in {len(chunks)} chunks across {self.jobs} workers")
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            # map() yields chunk results in submission order
+            for chunk, (chunk_results, files_read, bytes_read) in zip(chunks, executor.map(_index_chunk, [self.repl_directory] * len(chunks), chunks)):
+                for py_file, result in zip(chunk, chunk_results):
+                    results[py_file] = result
+                # Workers read around the content store, so their reads are counted here
+                self.metrics.count('files_read', files_read)
+                self.metrics.count('bytes_read', bytes_read)
+        return results
         
     def identify_framework(self):
         """Identify the web framework used in the application"""
         logger.info("🔍 Identifying web framework...")
         
         # Check package.json for Node.js projects
-        if self.package_json:
+        for package_json in self.package_json_files:
             try:
-                with open(self.package_json, 'r') as f:
+                with open(os.path.join(self.repl_directory, package_json), 'r') as f:
                     package_data = json.load(f)
                     dependencies = package_data.get('dependencies', {})
                     
-                    if 'react' in dependencies:
+                    if 'react' in dependencies and not self.has_react:
                         self.has_react = True
+                        self.detected_frameworks.append('react')
                         logger.info("Detected React framework")
                     
-                    if dependencies:
+                    if dependencies and not self.has_nodejs:
                         self.has_nodejs = True
+                        self.detected_frameworks.append('nodejs')
                         logger.info("Detected Node.js application")
             except json.JSONDecodeError:
-                logger.error("Error parsing package.json file")
-                self.issues.append("Invalid package.json file")
+                logger.error(f"Error parsing {package_json} file")
+                self.issues.append(f"Invalid {package_json} file")
         
         # Check Python files for imports
-        for py_file in self.python_files:
+        remaining = set(DETECTOR.names('python'))
+        for py_file, index in self.index_python_files().items():
+            # Skip binary files
+            if index is None:
+                continue
+            
+            for framework in DETECTOR.detect_modules(index['imports']):
+                if framework in remaining:
+                    remaining.discard(framework)
+                    self._mark_framework(framework)
+            
+            # Nothing left to learn once every registered framework has been seen
+            if not remaining:
+                break
+        
+        # JavaScript signatures are only scanned for when some have been registered
+        remaining = set(DETECTOR.names('javascript'))
+        for js_file in self.js_files if remaining else ():
             try:
-                with open(py_file, 'r') as f:
-                    content = f.read()
-                    
-                    if re.search(r'import\s+flask|from\s+flask\s+import', content):
-                        self.has_flask = True
-                        logger.info("Detected Flask framework")
-                    
-                    if re.search(r'import\s+django|from\s+django\s+import', content):
-                        self.has_django = True
-                        logger.info("Detected Django framework")
-                    
-                    if re.search(r'import\s+fastapi|from\s+fastapi\s+import', content):
-                        self.has_fastapi = True
-                        logger.info("Detected FastAPI framework")
-            except UnicodeDecodeError:
-                # Skip binary files
+                content = self.files.read(js_file)
+            except (UnicodeDecodeError, OSError):
                 continue
+            self.metrics.count('regex_evaluations')
+            for framework in DETECTOR.detect(content, 'javascript'):
+                if framework in remaining:
+                    remaining.discard(framework)
+                    self._mark_framework(framework)
+            if not remaining:
+                break
+    
+    def _mark_framework(self, framework):
+        self.detected_frameworks.append(framework)
+        if hasattr(self, f"has_{framework}"):
+            setattr(self, f"has_{framework}", True)
+        logger.info(f"Detected {DETECTOR.label(framework)} framework")
                 
     def check_for_common_issues(self):
         """Check for common issues that might prevent the application from running"""
@@ -133,29 +2654,28 @@ class ReplitFixer:
         
         # Check for Python web server binding
         if self.has_flask or self.has_fastapi:
-            host_port_pattern = re.compile(r'app\.run\(.*?host\s*=\s*[\'"](.+?)[\'"].*?port\s*=\s*(\d+)', re.DOTALL)
-            only_port_pattern = re.compile(r'app\.run\(.*?port\s*=\s*(\d+)', re.DOTALL)
-            
             has_proper_binding = False
             
-            for py_file in self.python_files:
-                try:
-                    with open(py_file, 'r') as f:
-                        content = f.read()
-                        
-                        host_port_match = host_port_pattern.search(content)
-                        if host_port_match:
-                            host = host_port_match.group(1)
-                            if host != '0.0.0.0':
-                                self.issues.append(f"Web server in {py_file} is not binding to 0.0.0.0 (using {host} instead)")
-                            else:
-                                has_proper_binding = True
-                        
-                        only_port_match = only_port_pattern.search(content)
-                        if only_port_match and not host_port_match:
-                            self.issues.append(f"Web server in {py_file} does not explicitly bind to 0.0.0.0")
-                except UnicodeDecodeError:
+            for py_file, index in self.index_python_files().items():
+                if index is None:
                     continue
+                
+                for call in index['calls']:
+                    host, port = call_binding(call)
+                    if host is not None:
+                        if 'value' not in host:
+                            # Bound to an expression (e.g. an environment variable) we cannot evaluate
+                            has_proper_binding = True
+                        elif host['value'] != '0.0.0.0':
+                            issue = f"Web server in {py_file} is not binding to 0.0.0.0 (using {host['value']} instead)"
+                            if issue not in self.issues:
+                                self.issues.append(issue)
+                        else:
+                            has_proper_binding = True
+                    elif port is not None:
+                        issue = f"Web server in {py_file} does not explicitly bind to 0.0.0.0"
+                        if issue not in self.issues:
+                            self.issues.append(issue)
             
             if not has_proper_binding and (self.has_flask or self.has_fastapi):
                 self.issues.append("No proper host binding found for web server (should bind to 0.0.0.0)")
@@ -170,6 +2690,7 @@ class ReplitFixer:
             try:
                 with open(replit_config_path, 'r') as f:
                     content = f.read()
+                    self.metrics.count('regex_evaluations')
                     if not re.search(r'run\s*=', content):
                         self.issues.append(".replit file exists but doesn't have a run command")
             except Exception as e:
@@ -189,45 +2710,173 @@ class ReplitFixer:
         if not self.has_flask and not self.has_django and not self.has_fastapi and not self.has_nodejs:
             if self.html_files and not any(f.endswith('index.html') for f in self.html_files):
                 self.issues.append("HTML files found but no index.html")
+        
+        # Check whether the shipped static assets are fast to serve
+        self.audit_assets()
     
-    def fix_issues(self):
-        """Try to fix the identified issues"""
-        logger.info("🔧 Attempting to fix issues...")
+    def static_assets(self):
+        """List the shipped static assets: text files under build output directories and generated bundles elsewhere"""
+        assets = []
+        for build_directory in self.build_directories:
+            if os.path.basename(build_directory) not in SHIPPED_DIRECTORIES:
+                continue
+            for directory, subdirectories, files in os.walk(os.path.join(self.repl_directory, build_directory)):
+                # Build caches such as .next/cache are never served
+                subdirectories[:] = sorted(name for name in subdirectories if name not in SKIPPED_DIRECTORIES and name != 'cache')
+                rel_dir = os.path.relpath(directory, self.repl_directory)
+                assets.extend(os.path.join(rel_dir, name) for name in sorted(files) if name.endswith(COMPRESSIBLE_ASSETS))
+        return assets + [rel_path for rel_path in self.generated_files if rel_path.endswith(COMPRESSIBLE_ASSETS)]
+    
+    def audit_assets(self):
+        """Measure the shipped static assets raw and compressed, and flag oversized or unhashed bundles and missing precompressed copies"""
+        self.asset_report = None
+        self.stale_assets = []
+        assets = self.static_assets()
+        if not assets:
+            return None
+        
+        encodings = tuple(encoding for encoding in PRECOMPRESSED_SUFFIXES if encoding == 'gzip' or _load_brotli() is not None)
+        if 'brotli' not in encodings:
+            logger.info("brotli is not installed, measuring and precompressing gzip only")
+        
+        stats = {}
+        sizes = {}
+        stale = {}
+        for rel_path in assets:
+            path = os.path.join(self.repl_directory, rel_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[rel_path] = st
+            sizes[rel_path] = {'size': st.st_size, **dict.fromkeys(encodings)}
+            stale[rel_path] = []
+            for encoding in encodings:
+                try:
+                    copy = os.stat(path + PRECOMPRESSED_SUFFIXES[encoding])
+                except OSError:
+                    copy = None
+                if copy is not None and copy.st_mtime_ns >= st.st_mtime_ns:
+                    # An up-to-date precompressed copy already tells the compressed size
+                    sizes[rel_path][encoding] = copy.st_size
+                else:
+                    stale[rel_path].append(encoding)
+        
+        # gzip is quick enough to measure every outdated asset with; brotli at full quality is not, so
+        # its size is only known from an up-to-date .br copy. Measured sizes go into the scan manifest
+        # so later runs do not compress an unchanged bundle again.
+        if self.manifest is not None:
+            self.manifest.load()
+        pending = []
+        for rel_path, missing in stale.items():
+            if 'gzip' not in missing:
+                continue
+            known = self.manifest.asset_sizes(rel_path, stats[rel_path]) if self.manifest is not None else None
+            if known is not None and 'gzip' in known:
+                sizes[rel_path]['gzip'] = known['gzip']
+            else:
+                pending.append((rel_path, ('gzip',)))
+        # Largest first, so the pool does not start the slowest bundle last
+        pending.sort(key=lambda asset: stats[asset[0]].st_size, reverse=True)
+        for rel_path, result in self._compress_assets(pending).items():
+            if result is None:
+                del sizes[rel_path]
+                continue
+            sizes[rel_path]['gzip'] = result['gzip']
+            if self.manifest is not None:
+                self.manifest.record_asset(rel_path, stats[rel_path], {'gzip': result['gzip']})
+        if self.manifest is not None:
+            self.manifest.prune_assets(set(stats))
+            self.manifest.save()
+        
+        # Bundles next to an HTML page are the ones browsers load and cache
+        web_roots = {os.path.dirname(rel_path) + os.sep for rel_path in sizes if rel_path.endswith('.html')}
+        report = []
+        for rel_path, measured in sizes.items():
+            if stale[rel_path] and measured['size'] >= MIN_PRECOMPRESS_SIZE and measured['gzip'] <= measured['size'] * (1 - MIN_COMPRESSION_GAIN):
+                self.stale_assets.append((rel_path, tuple(stale[rel_path])))
+            hashed = content_hashed(os.path.basename(rel_path)) if rel_path.endswith(BUNDLE_ASSETS) else None
+            report.append(dict(path=rel_path, **measured, hashed=hashed,
+                               precompressed=[encoding for encoding in encodings if encoding not in stale[rel_path]]))
+            
+            if not rel_path.endswith(BUNDLE_ASSETS):
+                continue
+            if measured['size'] > MAX_BUNDLE_SIZE:
+                self.issues.append(f"Bundle {rel_path} is {measured['size'] // 1024} KiB ({measured['gzip'] // 1024} KiB gzipped), "
+                                   f"over the {MAX_BUNDLE_SIZE // 1024} KiB budget")
+            if not hashed and any(rel_path.startswith(web_root) for web_root in web_roots):
+                self.issues.append(f"Bundle {rel_path} has no content hash in its name, so browsers cannot cache it long-term")
+        
+        if self.stale_assets:
+            suffixes = [PRECOMPRESSED_SUFFIXES[encoding] for encoding in encodings
+                        if any(encoding in missing for _, missing in self.stale_assets)]
+            self.issues.append(f"{len(self.stale_assets)} static assets have no up-to-date precompressed copies ({'/'.join(suffixes)})")
+        
+        # A total is only given for an encoding every asset has a size for
+        total = {key: None if any(measured[key] is None for measured in sizes.values()) else sum(measured[key] for measured in sizes.values())
+                 for key in ('size',) + encodings}
+        self.asset_report = {'encodings': list(encodings), 'total': dict(total, files=len(sizes)), 'assets': report}
+        
+        def describe(measured):
+            return ", ".join([f"{measured['size'] / 1024:.1f} KiB"] + [f"{measured[encoding] / 1024:.1f} KiB with {encoding}"
+                                                                       for encoding in encodings if measured[encoding] is not None])
+        
+        logger.info(f"Audited {len(sizes)} static assets: {describe(total)}")
+        for asset in sorted(report, key=lambda asset: asset['size'], reverse=True)[:5]:
+            logger.info(f"  {asset['path']}: {describe(asset)}")
+        return self.asset_report
+    
+    def _compress_assets(self, assets, write=False, jobs=None):
+        """Run compress_asset over (rel_path, encodings) pairs, across `jobs` processes (default: self.jobs) when there is more than one asset"""
+        jobs = jobs or self.jobs
+        rel_paths = [rel_path for rel_path, _ in assets]
+        if jobs > 1 and len(assets) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # One task per asset: a few large bundles dominate, so chunks would only unbalance the workers
+            with ProcessPoolExecutor(max_workers=min(jobs, len(assets))) as executor:
+                results = list(executor.map(compress_asset, [self.repl_directory] * len(assets), rel_paths,
+                                            [encodings for _, encodings in assets], [write] * len(assets)))
+        else:
+            results = [compress_asset(self.repl_directory, rel_path, encodings, write) for rel_path, encodings in assets]
+        # Assets are read around the content store, so the reads are counted here
+        self.metrics.count('files_read', sum(1 for result in results if result is not None))
+        self.metrics.count('bytes_read', sum(result['size'] for result in results if result is not None))
+        return dict(zip(rel_paths, results))
+    
+    def plan_fixes(self):
+        """Work out the fixes for the identified issues as a FixPlan, without touching disk"""
+        plan = FixPlan()
         
         # Fix 1: Create a .replit file if missing
         replit_config_path = os.path.join(self.repl_directory, '.replit')
         if not os.path.exists(replit_config_path):
             if self.python_files:
                 main_file = 'main.py' if 'main.py' in self.root_files else self.python_files[0]
-                with open(replit_config_path, 'w') as f:
-                    f.write(f"""[interpreter]
+                plan.create('.replit', f"""[interpreter]
 run = [\"python\", \"{main_file}\"]
 
 [env]
-PYTHONPATH = \"${PYTHONPATH}:{self.repl_directory}\"
+PYTHONPATH = \"${{PYTHONPATH}}:{self.repl_directory}\"
 
 [nix]
 channel = \"stable-21_11\"
 """)
-                self.fixes_applied.append(f"Created .replit file with run command for {main_file}")
-                self.fixed_error = True
+                plan.describe('.replit', f"Created .replit file with run command for {main_file}")
             elif self.has_nodejs:
-                with open(replit_config_path, 'w') as f:
-                    f.write("""[interpreter]
+                plan.create('.replit', """[interpreter]
 run = [\"npm\", \"start\"]
 
 [nix]
 channel = \"stable-21_11\"
 """)
-                self.fixes_applied.append("Created .replit file with npm start command")
-                self.fixed_error = True
+                plan.describe('.replit', "Created .replit file with npm start command")
         
         # Fix 2: Create a main.py file if missing but Python files exist
         if 'main.py' not in self.root_files and self.python_files:
             # Create a minimal Flask app to serve the existing files
             if self.html_files:
-                with open(os.path.join(self.repl_directory, 'main.py'), 'w') as f:
-                    f.write("""from flask import Flask, render_template, send_from_directory
+                plan.create('main.py', """from flask import Flask, render_template, send_from_directory
 import os
 
 app = Flask(__name__, 
@@ -249,17 +2898,15 @@ def index():
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
 """)
-                self.fixes_applied.append("Created a main.py file with Flask to serve your HTML content")
-                self.fixed_error = True
+                plan.describe('main.py', "Created a main.py file with Flask to serve your HTML content")
                 
                 # Create templates and static directories if they don't exist
-                os.makedirs('templates', exist_ok=True)
-                os.makedirs('static', exist_ok=True)
+                plan.directory('templates')
+                plan.directory('static')
                 
                 # If there's no index.html, create a minimal one in templates
                 if not any(f.endswith('index.html') for f in self.html_files):
-                    with open(os.path.join(self.repl_directory, 'templates', 'index.html'), 'w') as f:
-                        f.write("""<!DOCTYPE html>
+                    plan.create(os.path.join('templates', 'index.html'), """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -278,12 +2925,10 @@ if __name__ == '__main__':
     <script src="{{ url_for('static', filename='js/script.js') }}"></script>
 </body>
 </html>""")
-                    self.fixes_applied.append("Created a template index.html file")
+                    plan.describe(os.path.join('templates', 'index.html'), "Created a template index.html file")
                     
                     # Create CSS and JS directories and files
-                    os.makedirs('static/css', exist_ok=True)
-                    with open(os.path.join(self.repl_directory, 'static', 'css', 'style.css'), 'w') as f:
-                        f.write("""body {
+                    plan.create(os.path.join('static', 'css', 'style.css'), """body {
     font-family: Arial, sans-serif;
     line-height: 1.6;
     margin: 0;
@@ -319,11 +2964,9 @@ h1 {
     border: 1px solid #f5c6cb;
     color: #721c24;
 }""")
-                    self.fixes_applied.append("Created a CSS file")
+                    plan.describe(os.path.join('static', 'css', 'style.css'), "Created a CSS file")
                     
-                    os.makedirs('static/js', exist_ok=True)
-                    with open(os.path.join(self.repl_directory, 'static', 'js', 'script.js'), 'w') as f:
-                        f.write("""document.addEventListener('DOMContentLoaded', function() {
+                    plan.create(os.path.join('static', 'js', 'script.js'), """document.addEventListener('DOMContentLoaded', function() {
     console.log('Application is running properly!');
     
     // Add timestamp to show it's working
@@ -331,134 +2974,381 @@ h1 {
     timestampElem.textContent = `Page loaded at: ${new Date().toLocaleTimeString()}`;
     document.querySelector('.status-box').appendChild(timestampElem);
 });""")
-                    self.fixes_applied.append("Created a JavaScript file")
-                    self.fixed_error = True
+                    plan.describe(os.path.join('static', 'js', 'script.js'), "Created a JavaScript file")
         
         # Fix 3: Add requirements.txt if missing but Python files exist
         if not self.requirements_txt and self.python_files:
-            with open(os.path.join(self.repl_directory, 'requirements.txt'), 'w') as f:
-                requirements = ["flask==2.0.1"]
-                if self.has_django:
-                    requirements.append("django==3.2.7")
-                if self.has_fastapi:
-                    requirements.extend(["fastapi==0.68.0", "uvicorn==0.15.0"])
-                f.write("\n".join(requirements))
-            self.fixes_applied.append("Created a requirements.txt file with necessary dependencies")
-            self.fixed_error = True
+            requirements = ["flask==2.0.1"]
+            if self.has_django:
+                requirements.append("django==3.2.7")
+            if self.has_fastapi:
+                requirements.extend(["fastapi==0.68.0", "uvicorn==0.15.0"])
+            plan.create('requirements.txt', "\n".join(requirements))
+            plan.describe('requirements.txt', "Created a requirements.txt file with necessary dependencies")
         
         # Fix 4: Fix host binding issues in Flask/FastAPI apps
         if self.has_flask or self.has_fastapi:
-            for py_file in self.python_files:
+            for py_file, index in self.index_python_files().items():
+                calls = index['calls'] if index else []
+                if not calls:
+                    continue
+                
                 try:
-                    with open(py_file, 'r') as f:
-                        content = f.read()
-                    
-                    # Look for app.run() without proper host
-                    if 'app.run(' in content:
-                        host_pattern = re.compile(r'app\.run\(.*?host\s*=\s*[\'"](.+?)[\'"]', re.DOTALL)
-                        host_match = host_pattern.search(content)
-                        
-                        if not host_match:
-                            # No host parameter, add it
-                            new_content = re.sub(
-                                r'app\.run\((.*?)\)',
-                                r'app.run(\1, host="0.0.0.0")',
-                                content
-                            )
-                            with open(py_file, 'w') as f:
-                                f.write(new_content)
-                            self.fixes_applied.append(f"Updated {py_file} to bind to host 0.0.0.0")
-                            self.fixed_error = True
-                        elif host_match.group(1) != '0.0.0.0':
-                            # Wrong host, fix it
-                            new_content = re.sub(
-                                r'host\s*=\s*[\'"](.+?)[\'"]',
-                                r'host="0.0.0.0"',
-                                content
-                            )
-                            with open(py_file, 'w') as f:
-                                f.write(new_content)
-                            self.fixes_applied.append(f"Updated {py_file} to bind to host 0.0.0.0 instead of {host_match.group(1)}")
-                            self.fixed_error = True
+                    content = self.files.read(py_file)
                 except UnicodeDecodeError:
                     continue
+                
+                # Edit the indexed call sites only, so look-alikes in comments and strings stay untouched
+                data = content.encode('utf-8')
+                self.metrics.count('regex_evaluations')
+                line_starts = [0] + [match.end() for match in re.finditer(b'\n', data)]
+                added_host = False
+                replaced_hosts = []
+                for call in calls:
+                    host = call_binding(call)[0]
+                    if host is None:
+                        # No host parameter, add it before the closing parenthesis
+                        close = _byte_offset(line_starts, call['end']) - 1
+                        previous = close - 1
+                        while data[previous:previous + 1].isspace():
+                            previous -= 1
+                        separator = b'' if data[previous:previous + 1] in (b'(', b',') else b', '
+                        plan.edit(py_file, data, close, close, separator + b'host="0.0.0.0"')
+                        added_host = True
+                    elif host.get('value', '0.0.0.0') != '0.0.0.0':
+                        # Wrong host, fix it
+                        plan.edit(py_file, data, _byte_offset(line_starts, host['start']), _byte_offset(line_starts, host['end']), b'"0.0.0.0"')
+                        replaced_hosts.append(host['value'])
+                
+                if added_host:
+                    plan.describe(py_file, f"Updated {py_file} to bind to host 0.0.0.0")
+                if replaced_hosts:
+                    plan.describe(py_file, f"Updated {py_file} to bind to host 0.0.0.0 instead of {replaced_hosts[0]}")
+        
+        return plan
+    
+    def fix_issues(self, dry_run=False):
+        """Try to fix the identified issues; with dry_run, keep the fixes as a unified diff and return whether there are any"""
+        logger.info("🔧 Attempting to fix issues...")
+        
+        plan = self.plan_fixes()
+        if dry_run:
+            diff = self.dry_run_diff = plan.diff()
+            for rel_path, encodings in self.stale_assets:
+                logger.info(f"Would precompress {rel_path} ({', '.join(encodings)})")
+            return bool(diff) or bool(self.stale_assets)
+        
+        written = plan.apply(self.repl_directory)
+        self.fixes_applied.extend(plan.descriptions(written))
+        for rel_path in written:
+            self.files.invalidate(rel_path)
+        if any(rel_path.endswith('.py') for rel_path in written):
+            # Rewritten files are re-indexed the next time the index is queried
+            self.python_index = None
+        if written:
+            self.fixed_error = True
+        
+        precompressed = self.precompress_assets()
+        if precompressed:
+            self.fixes_applied.append(f"Precompressed static assets into {len(precompressed)} "
+                                      f"{'/'.join(sorted({os.path.splitext(rel_path)[1] for rel_path in precompressed}))} copies")
+            self.fixed_error = True
         
         return self.fixed_error
     
+    def precompress_assets(self):
+        """Write the missing or outdated precompressed copies found by audit_assets; return the rel_paths written"""
+        if not self.stale_assets:
+            return []
+        
+        started = time.perf_counter()
+        workers = min(self.compress_jobs, len(self.stale_assets))
+        results = self._compress_assets(self.stale_assets, write=True, jobs=self.compress_jobs)
+        written = []
+        for rel_path, encodings in self.stale_assets:
+            result = results.get(rel_path)
+            if result is None:
+                logger.error(f"Could not precompress {rel_path}: it can no longer be read")
+                continue
+            errors = result.get('errors', {})
+            for target, error in errors.items():
+                logger.error(f"Could not write {target}: {error}")
+            written.extend(rel_path + PRECOMPRESSED_SUFFIXES[encoding] for encoding in encodings
+                           if rel_path + PRECOMPRESSED_SUFFIXES[encoding] not in errors)
+        logger.info(f"Precompressed {len(self.stale_assets)} static assets into {len(written)} files in "
+                    f"{time.perf_counter() - started:.2f}s with {workers} worker{'s' if workers != 1 else ''}")
+        self.stale_assets = []
+        return written
+    
     def install_dependencies(self):
         """Install required dependencies"""
         logger.info("📦 Installing dependencies...")
         
-        if self.requirements_txt:
-            try:
-                logger.info("Installing Python dependencies...")
-                subprocess.run(["pip", "install", "-r", self.requirements_txt], check=True)
-                logger.info("Python dependencies installed successfully")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Error installing Python dependencies: {str(e)}")
+        jobs = []
+        if self.requirements_txt or self.pyproject_toml:
+            jobs.extend(self.plan_python_install())
         
-        if self.package_json:
-            try:
-                logger.info("Installing Node.js dependencies...")
-                subprocess.run(["npm", "install"], check=True)
-                logger.info("Node.js dependencies installed successfully")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Error installing Node.js dependencies: {str(e)}")
+        if self.package_json_files:
+            jobs.extend(self.plan_node_installs())
+        
+        if not jobs:
+            logger.info("All dependencies are already installed")
+            self.install_results = []
+            return
+        
+        installer = AsyncInstaller(concurrency=self.install_concurrency, timeout=self.install_timeout)
+        self.install_results = installer.run(jobs)
+        
+        for job, result in zip(jobs, self.install_results):
+            self.metrics.subprocess(job['name'], result['duration'])
+            if result['returncode'] == 0:
+                logger.info(f"{job['description']} installed successfully in {result['duration']:.1f}s")
+                if job['name'] == 'pip':
+                    InstallHistory(os.path.join(self.repl_directory, CACHE_DIR, 'install.json')).record(
+                        'pip', result['duration'], job['requirements'])
+            elif result['timed_out']:
+                logger.error(f"Error installing {job['description']}: timed out after {self.install_timeout}s")
+            else:
+                logger.error(f"Error installing {job['description']}: {result['error'] or 'exit code ' + str(result['returncode'])}")
+        
+        wall = max(result['finished'] for result in self.install_results) - min(result['started'] for result in self.install_results)
+        total = sum(result['duration'] for result in self.install_results)
+        logger.info(f"Ran {len(jobs)} installs in {wall:.1f}s ({total:.1f}s if run one after another)")
+    
+    def plan_node_installs(self):
+        """Return install jobs for the package trees whose node_modules drifted from their lockfile"""
+        checker = NpmLockfileChecker(self.repl_directory)
+        self.npm_install_report = []
+        jobs = []
+        for tree, members in self.npm_trees().items():
+            label = tree or '.'
+            started = time.perf_counter()
+            command, reason = checker.plan(tree, members)
+            self.npm_install_report.append({'tree': label, 'command': command, 'reason': reason,
+                                            'check_seconds': time.perf_counter() - started})
+            if command is None:
+                logger.info(f"Node.js dependencies in {label} are up to date ({reason}), skipping npm")
+                continue
+            
+            logger.info(f"Node.js dependencies in {label} need {' '.join(command)} ({reason})")
+            jobs.append({
+                'name': f"npm:{label}",
+                'description': f"Node.js dependencies in {label}",
+                'command': command,
+                'cwd': os.path.join(self.repl_directory, tree),
+            })
+        return jobs
+    
+    def plan_python_install(self):
+        """Return a pip job for the Python requirements the active interpreter does not already satisfy"""
+        started = time.perf_counter()
+        plan = PythonRequirementChecker(self.repl_directory).plan(self.requirements_txt, self.pyproject_toml)
+        check_seconds = time.perf_counter() - started
+        history = InstallHistory(os.path.join(self.repl_directory, CACHE_DIR, 'install.json'))
+        
+        for requirement, detail in plan['satisfied']:
+            logger.info(f"  ✓ {requirement} ({detail})")
+        for requirement, detail in plan['install']:
+            logger.info(f"  ✗ {requirement} ({detail})")
+        
+        per_requirement = history.seconds_per_requirement('pip')
+        saved = f", saving about {per_requirement * len(plan['satisfied']):.1f}s" if per_requirement and plan['satisfied'] else ""
+        logger.info(f"Checked {len(plan['satisfied']) + len(plan['install'])} Python requirements in {check_seconds * 1000:.0f}ms: "
+                    f"skipping {len(plan['satisfied'])} already satisfied{saved}")
+        self.python_install_report = {
+            'skipped': [requirement for requirement, _ in plan['satisfied']],
+            'installed': [requirement for requirement, _ in plan['install']],
+            'check_seconds': check_seconds,
+            'estimated_seconds_saved': per_requirement * len(plan['satisfied']) if per_requirement else None,
+        }
+        
+        if not plan['install']:
+            logger.info("Python dependencies already satisfied, not starting pip")
+            return []
+        
+        # The subset goes to pip as a requirements file, so lines with options ("-e ./pkg",
+        # "six==1.16.0 --hash=sha256:...") keep the meaning they have in requirements.txt
+        lines = [requirement for requirement, _ in plan['install']]
+        if any('--hash' in line for line in lines):
+            # Hash-checking mode needs every pinned line, so hand pip the whole file as before
+            lines = [f"-r {os.path.join(self.repl_directory, self.requirements_txt)}"] + [line for line in lines if '--hash' not in line]
+        subset = os.path.join(self.repl_directory, CACHE_DIR, 'requirements-install.txt')
+        try:
+            make_cache_directory(subset)
+            with open(subset, 'w') as f:
+                f.write("\n".join(lines) + "\n")
+            requirements = ["-r", subset]
+        except OSError as e:
+            # pyproject.toml dependencies are plain specifiers, so they are safe as arguments
+            logger.warning(f"Could not write {subset}: {str(e)}, installing every declared requirement instead")
+            requirements = ["-r", self.requirements_txt] if self.requirements_txt else lines
+        return [{
+            'name': 'pip',
+            'description': f"{len(plan['install'])} Python dependencies",
+            'command': [sys.executable, "-m", "pip", "install", *plan['options'], *requirements],
+            'cwd': self.repl_directory,
+            'requirements': len(plan['install']),
+        }]
+    
+    def expected_port(self):
+        """Return (port, source) for the port the application should listen on, or (None, None)"""
+        # An explicit port in app.run()/uvicorn.run() wins over configuration
+        for py_file, index in (self.index_python_files() if self.python_files else {}).items():
+            for call in index['calls'] if index else ():
+                port = call_binding(call)[1]
+                if port is not None and isinstance(port.get('value'), int):
+                    return port['value'], f"{call['target']}() in {py_file}"
+        
+        config = read_replit_config(self.repl_directory) or {}
+        env_port = (config.get('env') or {}).get('PORT')
+        if str(env_port or '').isdigit():
+            return int(env_port), "[env] PORT in .replit"
+        if os.environ.get('PORT', '').isdigit():
+            return int(os.environ['PORT']), "PORT environment variable"
+        for ports in config.get('ports') or ():
+            if isinstance(ports, dict) and isinstance(ports.get('localPort'), int):
+                return ports['localPort'], "[[ports]] localPort in .replit"
+        return None, None
+    
+    def run_command(self):
+        """Return the run command from .replit as an argument list, logging why when there is none"""
+        if not os.path.exists(os.path.join(self.repl_directory, '.replit')):
+            logger.error("No .replit file found, cannot determine run command")
+            return None
+        command = replit_run_command(read_replit_config(self.repl_directory))
+        if command is None:
+            logger.error(".replit is not valid TOML or has no run command")
+        return command
     
     def run_application(self):
         """Attempt to run the application"""
+        import subprocess
+        
         logger.info("🚀 Attempting to run the application...")
         
-        replit_config_path = os.path.join(self.repl_directory, '.replit')
-        if os.path.exists(replit_config_path):
-            try:
-                with open(replit_config_path, 'r') as f:
-                    content = f.read()
-                    run_match = re.search(r'run\s*=\s*\[(.*?)\]', content)
-                    if run_match:
-                        run_command = run_match.group(1)
-                        run_command = re.sub(r'["\'\s]', '', run_command)
-                        run_parts = run_command.split(',')
-                        
-                        logger.info(f"Executing run command: {' '.join(run_parts)}")
-                        process = subprocess.Popen(run_parts)
-                        
-                        # Wait a bit to see if it crashes immediately
-                        time.sleep(2)
-                        if process.poll() is not None:
-                            logger.error(f"Process exited with code {process.returncode}")
-                            return False
-                        
-                        logger.info("Application appears to be running...")
-                        return True
-            except Exception as e:
-                logger.error(f"Error running application: {str(e)}")
+        run_parts = self.run_command()
+        if run_parts is None:
+            return False
+        try:
+            port, port_source = self.expected_port()
+            logger.info(f"Executing run command: {' '.join(run_parts)}")
+            # The [env] table also applies to the app, so a PORT taken from it is the one it listens on
+            process = subprocess.Popen(run_parts, cwd=self.repl_directory,
+                                       env=replit_environment(read_replit_config(self.repl_directory)))
+            
+            if port is None:
+                # Nothing to probe; wait a bit to see if it crashes immediately
+                time.sleep(2)
+                if process.poll() is not None:
+                    logger.error(f"Process exited with code {process.returncode}")
+                    return False
+                
+                logger.info("Application appears to be running...")
+                if self.load_test is not None:
+                    # A requested load test that cannot run must not pass as one that met its thresholds
+                    logger.error("No port is known for the application, so the load test cannot run")
+                    return False
+                return True
+            
+            logger.info(f"Waiting up to {self.ready_timeout:.0f}s for port {port} (from {port_source})...")
+            probe = ReadinessProbe(port, health_path=self.health_path, deadline=self.ready_timeout)
+            self.readiness = probe.wait(process)
+            self.readiness['port_source'] = port_source
+            self.metrics.subprocess(f"{run_parts[0]} (until ready)", self.readiness['time_to_ready'] or self.ready_timeout)
+            if not self.readiness['ready']:
+                status = f", last health check status {self.readiness['status']}" if self.readiness['status'] else ""
+                logger.error(f"Application did not become ready on port {port}: {self.readiness['reason'] or 'health check failed'}{status}")
                 return False
-        else:
-            logger.error("No .replit file found, cannot determine run command")
+            
+            logger.info(f"Application is ready on port {port} after {self.readiness['time_to_ready']:.2f}s "
+                        f"({self.readiness['attempts']} probes)")
+            if self.load_test is not None:
+                return self.run_load_test(port)
+            return True
+        except Exception as e:
+            logger.error(f"Error running application: {str(e)}")
+            return False
+    
+    def run_load_test(self, port):
+        """Drive the configured load against the launched application and return whether it met the thresholds"""
+        options = self.load_test
+        logger.info(f"🏋️ Sending {options['concurrency']} concurrent requests to port {port} for {options['duration']:.0f}s "
+                    f"({', '.join(options['paths'])})")
+        # Load the address the readiness probe reached the application on
+        host = self.readiness['host'] if self.readiness else '127.0.0.1'
+        tester = LoadTester(port, paths=options['paths'], concurrency=options['concurrency'], duration=options['duration'], host=host)
+        self.load_report = tester.run()
+        reasons = load_test_failures(self.load_report, max_error_rate=options.get('max_error_rate'),
+                                     max_p95=options.get('max_p95'), max_p99=options.get('max_p99'),
+                                     min_throughput=options.get('min_throughput'))
+        self.load_report['passed'] = not reasons
+        self.load_report['failed_thresholds'] = reasons
+        
+        latency = self.load_report['latency']
+        if latency['p50'] is not None:
+            logger.info(f"{self.load_report['requests']} requests, {self.load_report['throughput']:.1f} req/s, "
+                        f"{self.load_report['error_rate']:.1%} errors, p50 {latency['p50'] * 1000:.1f}ms, "
+                        f"p95 {latency['p95'] * 1000:.1f}ms, p99 {latency['p99'] * 1000:.1f}ms "
+                        f"over {self.load_report['connections_opened']} connections")
+        for reason in reasons:
+            logger.error(f"Load test failed: {reason}")
+        return not reasons
+    
+    def supervise_application(self, duration=None, sample_interval=1.0, max_backoff=30.0, crash_loop=5):
+        """Run the application under a ProcessSupervisor and return whether it stayed up"""
+        logger.info("🩺 Supervising the application...")
+        
+        run_parts = self.run_command()
+        if run_parts is None:
             return False
+        port, port_source = self.expected_port()
+        if port is not None:
+            logger.info(f"Probing port {port} (from {port_source}) after every start")
+        supervisor = ProcessSupervisor(run_parts, self.repl_directory, port=port, health_path=self.health_path,
+                                       ready_timeout=self.ready_timeout, sample_interval=sample_interval,
+                                       max_backoff=max_backoff, crash_loop=crash_loop, duration=duration,
+                                       env=replit_environment(read_replit_config(self.repl_directory)))
+        self.supervision = supervisor.run()
+        
+        memory = self.supervision['memory']
+        growth = memory['rss_growth_per_minute']
+        logger.info(f"Verdict: {self.supervision['verdict']} after {self.supervision['elapsed']:.1f}s, "
+                    f"{self.supervision['restarts']} restarts")
+        if self.supervision['startup_time']['median'] is not None:
+            logger.info(f"Startup time: {self.supervision['startup_time']['median']:.2f}s median")
+        if memory['peak_rss'] is not None:
+            logger.info(f"Memory: {memory['peak_rss'] / 1048576:.1f} MiB peak RSS"
+                        + (f", {growth / 1048576:+.2f} MiB/min" if growth is not None else "")
+                        + f", {self.supervision['cpu_seconds']:.1f}s CPU, {self.supervision['peak_fds']} fds at most")
+        ready = port is None or any(run['ready'] for run in self.supervision['runs'])
+        return ready and self.supervision['verdict'] in ('stable', 'restarted')
+    
+    def diagnose(self):
+        """Scan, detect frameworks and check for issues without changing anything; return the issues"""
+        with self.metrics.phase('scan'):
+            self.scan_directory()
+        with self.metrics.phase('detect'):
+            self.identify_framework()
+        with self.metrics.phase('check'):
+            self.check_for_common_issues()
+        return self.issues
     
     def run_diagnostics(self):
         """Run the full diagnostic process"""
         logger.info("🔍 Starting diagnostics...")
         
-        self.scan_directory()
-        self.identify_framework()
-        self.check_for_common_issues()
+        self.diagnose()
         
-        if self.issues:
-            logger.info("⚠️ Issues found:")
-            for issue in self.issues:
-                logger.info(f"  - {issue}")
-            
-            fixed = self.fix_issues()
+        if self.log_issues():
+            with self.metrics.phase('fix'):
+                fixed = self.fix_issues()
             if fixed:
-                logger.info("✅ Applied fixes:")
-                for fix in self.fixes_applied:
-                    logger.info(f"  - {fix}")
+                self.log_fixes()
                 
-                self.install_dependencies()
-                success = self.run_application()
+                with self.metrics.phase('install'):
+                    self.install_dependencies()
+                with self.metrics.phase('run'):
+                    success = self.run_application()
                 
                 if success:
                     logger.info("🎉 Application is now running! Refresh your Replit page to see it in action.")
@@ -470,9 +3360,10 @@ h1 {
                 logger.warning("⚠️ Couldn't apply automatic fixes. Manual intervention needed.")
                 return False
         else:
-            logger.info("✅ No issues found.")
-            self.install_dependencies()
-            success = self.run_application()
+            with self.metrics.phase('install'):
+                self.install_dependencies()
+            with self.metrics.phase('run'):
+                success = self.run_application()
             
             if success:
                 logger.info("🎉 Application is running fine!")
@@ -480,10 +3371,494 @@ h1 {
             else:
                 logger.error("⚠️ Application is not running properly despite no obvious issues.")
                 return False
+    
+    def log_issues(self):
+        """Log the identified issues, or that there are none; return whether there are any"""
+        if not self.issues:
+            logger.info("✅ No issues found.")
+            return False
+        logger.info("⚠️ Issues found:")
+        for issue in self.issues:
+            logger.info(f"  - {issue}")
+        return True
+    
+    def log_fixes(self):
+        """Log the fixes that were applied"""
+        logger.info("✅ Applied fixes:")
+        for fix in self.fixes_applied:
+            logger.info(f"  - {fix}")
+    
+    def inventory(self):
+        """Return the scanned files by category, as scan_directory recorded them"""
+        return {
+            'python': self.python_files,
+            'javascript': self.js_files,
+            'html': self.html_files,
+            'generated': self.generated_files,
+            'package_json': self.package_json_files,
+            'config': [path for path in (self.requirements_txt, self.pyproject_toml, self.poetry_lock, self.replit_nix) if path],
+            'build_directories': self.build_directories,
+        }
+    
+    def watched_files(self):
+        """Return the files whose edits can change the verdict, for watchers that cannot watch directories"""
+        files = self.python_files + self.js_files + self.html_files + self.package_json_files
+        for rel_dir in self.directories:
+            for name in WATCHED_NAMES:
+                if name != 'package.json':
+                    files.append(os.path.join(rel_dir, name) if rel_dir else name)
+        return files
+    
+    def rediagnose(self, changes):
+        """Bring the inventory, index and issues up to date after file changes; return whether the inventory was rebuilt"""
+        changed = set()
+        structural = False
+        inventory = None
+        for rel_path, is_structural, is_dir in changes:
+            if rel_path.split(os.sep, 1)[0] in SKIPPED_DIRECTORIES:
+                continue
+            name = os.path.basename(rel_path)
+            if is_dir:
+                structural = structural or is_structural
+            elif name.endswith(WATCHED_SUFFIXES) or name in WATCHED_NAMES:
+                changed.add(rel_path)
+                if name in IGNORE_FILES:
+                    # Ignore files change which files are part of the inventory
+                    structural = True
+                elif is_structural and name != '.replit' and not structural:
+                    # An atomic save renames over a file the inventory already has; only additions and removals change it
+                    if inventory is None:
+                        inventory = set(self.python_files + self.js_files + self.html_files + self.generated_files + self.package_json_files)
+                        inventory.update(filter(None, (self.requirements_txt, self.pyproject_toml, self.poetry_lock, self.replit_nix)))
+                    structural = os.path.isfile(os.path.join(self.repl_directory, rel_path)) != (rel_path in inventory)
+        
+        if not changed and not structural:
+            return None
+        
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        try:
+            for rel_path in changed:
+                self.files.invalidate(rel_path)
+            if structural:
+                self._reset_inventory()
+                self.scan_directory()
+            self.refresh_python_index(changed)
+            # Detection and checks run over the in-memory index, so only changed files are read again
+            self._reset_verdict()
+            self.identify_framework()
+            self.check_for_common_issues()
+        finally:
+            logger.setLevel(level)
+        return structural
+    
+    def watch(self, debounce=0.05, poll_interval=0.5, polling=False):
+        """Diagnose once, then keep re-diagnosing on file changes and print how the issues moved, until interrupted"""
+        self.scan_directory()
+        self.identify_framework()
+        self.check_for_common_issues()
+        for issue in self.issues:
+            logger.info(f"  - {issue}")
+        
+        watcher = None
+        if not polling:
+            try:
+                watcher = InotifyWatcher(self.repl_directory)
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify is not available ({str(e)}), polling every {poll_interval}s instead")
+        if watcher is None:
+            watcher = PollingWatcher(self.repl_directory, interval=poll_interval)
+        watcher.watch(self.directories, self.watched_files())
+        logger.info(f"👀 Watching {len(self.directories)} directories with {type(watcher).__name__}, press Ctrl+C to stop")
+        
+        recheck = []
+        try:
+            while True:
+                changes = recheck or watcher.changes()
+                # Debounce: an editor save or a checkout arrives as a burst of events
+                while True:
+                    more = watcher.changes(debounce)
+                    if not more:
+                        break
+                    changes.extend(more)
+                
+                started = time.perf_counter()
+                previous = list(self.issues)
+                rebuilt = self.rediagnose(changes)
+                if rebuilt is None:
+                    recheck = []
+                    continue
+                if rebuilt or isinstance(watcher, PollingWatcher):
+                    added = watcher.watch(self.directories, self.watched_files())
+                    # Files can land in a new directory before it is watched, so look at it once more
+                    recheck = [(rel_dir, True, True) for rel_dir in added] if rebuilt else []
+                elapsed = time.perf_counter() - started
+                
+                new, resolved, unchanged = issue_diff(previous, self.issues)
+                if not new and not resolved and changes is recheck:
+                    continue
+                logger.info(f"🔁 Re-diagnosed {len(changes)} changes in {elapsed * 1000:.1f}ms: "
+                            f"{len(new)} new, {len(resolved)} resolved, {len(unchanged)} unchanged")
+                for issue in new:
+                    logger.info(f"  + {issue}")
+                for issue in resolved:
+                    logger.info(f"  - {issue} (resolved)")
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        finally:
+            watcher.close()
+            if self.manifest is not None:
+                self.manifest.save()
+    
+    def report(self, success=None):
+        """Return a machine-readable summary of the run, including metrics when instrumentation is on"""
+        return {
+            'directory': self.repl_directory,
+            'success': success,
+            'frameworks': self.detected_frameworks,
+            'issues': self.issues,
+            'fixes_applied': self.fixes_applied,
+            'python_files': len(self.python_files),
+            'js_files': len(self.js_files),
+            'html_files': len(self.html_files),
+            'files': self.inventory(),
+            'install': {
+                'python': self.python_install_report,
+                'npm': self.npm_install_report,
+                'results': self.install_results,
+            },
+            'readiness': self.readiness,
+            'supervision': self.supervision,
+            'load_test': self.load_report,
+            'assets': self.asset_report,
+            'dry_run_diff': self.dry_run_diff,
+            'metrics': self.metrics.report(),
+        }
 
 
-if __name__ == "__main__":
-    print("""
+def expand_roots(patterns):
+    """Expand root paths and glob patterns into a sorted list of unique directories"""
+    import glob
+    
+    roots = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [match for match in glob.glob(os.path.expanduser(pattern)) if os.path.isdir(match)]
+            if not matches:
+                logger.warning(f"No directories match {pattern}")
+        elif os.path.isdir(os.path.expanduser(pattern)):
+            matches = [os.path.expanduser(pattern)]
+        else:
+            logger.warning(f"Not a directory, skipping: {pattern}")
+            matches = []
+        roots.extend(os.path.abspath(match) for match in matches)
+    return sorted(set(roots))
+
+
+class _LogCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(f"{record.levelname}: {record.getMessage()}")
+
+
+def _fleet_worker(root, options, connection):
+    """Diagnose one repository in a child process and send its JSON report back"""
+    # Each repository gets its own process so a crash, a hang or leaked state stays contained
+    collector = _LogCollector()
+    logging.getLogger().handlers = [collector]
+    started = time.perf_counter()
+    try:
+        metrics = PhaseRecorder()
+        # Daemonic workers may not start process pools of their own; the fleet runs repositories in parallel instead
+        fixer = ReplitFixer(root=root, metrics=metrics, **dict(options, jobs=1, compress_jobs=1))
+        fixer.diagnose()
+        metrics.finish()
+        record = dict(fixer.report(), status='ok')
+    except Exception as e:
+        record = {'directory': root, 'status': 'error', 'error': f"{type(e).__name__}: {str(e)}"}
+    record['duration'] = time.perf_counter() - started
+    record['log'] = collector.messages
+    connection.send(json.dumps(record, default=str))
+    connection.close()
+
+
+class FleetRunner:
+    """Diagnose many repositories with a bounded pool of worker processes and aggregate the results"""
+
+    def __init__(self, workers=None, timeout=120.0, options=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.options = options or {}
+
+    def run(self, roots, output):
+        """Diagnose every root, writing one JSON line per repository to `output`; return the summary"""
+        import multiprocessing
+        from multiprocessing.connection import wait
+        
+        pending = list(reversed(roots))
+        running = {}
+        records = []
+        
+        def finish(process, record):
+            connection = running.pop(process)[2]
+            connection.close()
+            process.join()
+            record['type'] = 'repo'
+            records.append(record)
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+        
+        while pending or running:
+            while pending and len(running) < self.workers:
+                root = pending.pop()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_fleet_worker, args=(root, self.options, sender), daemon=True)
+                process.start()
+                sender.close()
+                running[process] = (root, time.monotonic(), receiver)
+            
+            now = time.monotonic()
+            next_deadline = min(started + self.timeout for _, started, _ in running.values())
+            ready = wait([receiver for _, _, receiver in running.values()] + [process.sentinel for process in running],
+                         timeout=max(0, next_deadline - now))
+            
+            for process, (root, started, receiver) in list(running.items()):
+                if receiver in ready or process.sentinel in ready:
+                    try:
+                        record = json.loads(receiver.recv())
+                    except (EOFError, OSError, ValueError):
+                        # Gone without a report, e.g. killed by a signal or the OOM killer
+                        process.join(1)
+                        if process.is_alive():
+                            process.kill()
+                        record = {'directory': root, 'status': 'crashed', 'exitcode': process.exitcode,
+                                  'duration': time.monotonic() - started}
+                    finish(process, record)
+                elif time.monotonic() - started > self.timeout:
+                    process.kill()
+                    finish(process, {'directory': root, 'status': 'timeout', 'duration': time.monotonic() - started})
+        
+        summary = self.summarize(records)
+        output.write(json.dumps(dict(summary, type='summary'), default=str) + "\n")
+        output.flush()
+        return summary
+
+    @staticmethod
+    def summarize(records):
+        """Aggregate per-repository records into counts, common issues and the slowest repositories"""
+        from collections import Counter
+        
+        statuses = Counter(record['status'] for record in records)
+        frameworks = Counter(framework for record in records for framework in record.get('frameworks') or ())
+        # Issue texts embed file names; group on the text before the first path-specific part
+        issues = Counter(issue for record in records
+                         for issue in {re.sub(r' in \S+', ' in <file>', issue) for issue in record.get('issues') or ()})
+        durations = sorted(record['duration'] for record in records)
+        return {
+            'repositories': len(records),
+            'statuses': dict(statuses),
+            'with_issues': sum(1 for record in records if record.get('issues')),
+            'frameworks': dict(frameworks.most_common()),
+            'common_issues': [{'issue': issue, 'repositories': count} for issue, count in issues.most_common(20)],
+            'slowest': [{'directory': record['directory'], 'duration': record['duration']}
+                        for record in sorted(records, key=lambda record: record['duration'], reverse=True)[:10]],
+            'total_seconds': sum(durations),
+            'median_seconds': durations[len(durations) // 2] if durations else None,
+        }
+
+
+# Options shared by the subcommands, grouped by the phase they configure
+OPTION_GROUPS = {
+    'common': [
+        (('--root',), {'metavar': 'DIR', 'help': "diagnose DIR instead of the current directory"}),
+        (('--jobs', '-j'), {'type': int, 'default': 1, 'metavar': 'N',
+                            'help': "analyse files with N worker processes (0 = one per CPU, default: 1; ignored by --fleet)"}),
+        (('--no-cache',), {'action': 'store_true', 'help': "ignore and do not update the scan manifest in .replit_fixer/cache"}),
+        (('--no-git-index',), {'action': 'store_true', 'help': "always walk the directory instead of listing tracked files from .git/index"}),
+        (('--json',), {'action': 'store_true', 'help': "print a machine-readable JSON report with per-phase metrics to stdout"}),
+        (('--profile',), {'metavar': 'FILE', 'help': "profile every phase and write the pstats dump of the slowest one to FILE"}),
+    ],
+    'check': [
+        (('--watch',), {'action': 'store_true',
+                        'help': "stay running and re-diagnose whenever files change, printing new and resolved issues"}),
+        (('--debounce',), {'type': float, 'default': 50, 'metavar': 'MS',
+                           'help': "in --watch mode, wait for this long without changes before re-diagnosing (default: 50)"}),
+        (('--poll',), {'action': 'store_true', 'help': "in --watch mode, poll for changes instead of using inotify"}),
+        (('--fleet',), {'nargs': '+', 'metavar': 'ROOT',
+                        'help': "diagnose every matching directory (paths or glob patterns) without fixing anything"}),
+        (('--fleet-workers',), {'type': int, 'default': 0, 'metavar': 'N',
+                                'help': "in --fleet mode, diagnose N repositories at the same time (default: one per CPU)"}),
+        (('--fleet-timeout',), {'type': float, 'default': 120, 'metavar': 'SECONDS',
+                                'help': "in --fleet mode, kill the diagnosis of a repository after this long (default: 120)"}),
+        (('--fleet-output',), {'metavar': 'FILE', 'help': "in --fleet mode, write the JSON lines report to FILE instead of stdout"}),
+    ],
+    'fix': [
+        (('--dry-run',), {'action': 'store_true',
+                          'help': "print the fixes as unified diffs without changing any file; exit 1 if there are any"}),
+        (('--compress-jobs',), {'type': int, 'default': 0, 'metavar': 'N',
+                                'help': "write precompressed .gz/.br copies with N worker processes (default: one per CPU)"}),
+    ],
+    'install': [
+        (('--install-concurrency',), {'type': int, 'default': 4, 'metavar': 'N',
+                                      'help': "run at most N dependency installs at the same time (default: 4)"}),
+        (('--install-timeout',), {'type': float, 'default': 900, 'metavar': 'SECONDS',
+                                  'help': "kill a dependency install that runs longer than this (default: 900)"}),
+    ],
+    'run': [
+        (('--ready-timeout',), {'type': float, 'default': 30.0, 'metavar': 'SECONDS',
+                                'help': "how long to wait for the application to accept connections (default: 30)"}),
+        (('--health-path',), {'metavar': 'PATH', 'help': "also require an HTTP GET of PATH to answer with a non-5xx status"}),
+        (('--load',), {'action': 'store_true',
+                       'help': "once the application is ready, send it concurrent requests and check the results"}),
+        (('--load-paths',), {'nargs': '+', 'default': ['/'], 'metavar': 'PATH', 'help': "paths requested in turn (default: /)"}),
+        (('--load-concurrency',), {'type': int, 'default': 10, 'metavar': 'N', 'help': "requests in flight at once (default: 10)"}),
+        (('--load-duration',), {'type': float, 'default': 5.0, 'metavar': 'SECONDS', 'help': "how long to send requests (default: 5)"}),
+        (('--load-max-error-rate',), {'type': float, 'default': 0.01, 'metavar': 'FRACTION',
+                                      'help': "fail when more requests than this fail or answer 4xx/5xx (default: 0.01)"}),
+        (('--load-max-p95',), {'type': float, 'metavar': 'MS', 'help': "fail when the 95th percentile latency is higher"}),
+        (('--load-max-p99',), {'type': float, 'metavar': 'MS', 'help': "fail when the 99th percentile latency is higher"}),
+        (('--load-min-throughput',), {'type': float, 'metavar': 'RPS', 'help': "fail when fewer requests per second are answered"}),
+        (('--supervise',), {'action': 'store_true',
+                            'help': "keep the application running, restart it when it exits and sample its resource use"}),
+        (('--duration',), {'type': float, 'metavar': 'SECONDS',
+                           'help': "with --supervise, stop after this long and report (default: until interrupted)"}),
+        (('--sample-interval',), {'type': float, 'default': 1.0, 'metavar': 'SECONDS',
+                                  'help': "with --supervise, how often to sample memory, CPU and file descriptors (default: 1)"}),
+        (('--max-backoff',), {'type': float, 'default': 30.0, 'metavar': 'SECONDS',
+                              'help': "with --supervise, longest wait before a restart (default: 30)"}),
+        (('--crash-loop',), {'type': int, 'default': 5, 'metavar': 'N',
+                             'help': "with --supervise, give up after N starts in a row that exit quickly (default: 5)"}),
+    ],
+}
+
+COMMANDS = {
+    'scan': (('common',), "list the files that would be analysed"),
+    'check': (('common', 'check'), "diagnose without changing anything; exit 1 if there are issues"),
+    'fix': (('common', 'fix'), "diagnose and apply the fixes"),
+    'install': (('common', 'install'), "install missing Python and Node.js dependencies"),
+    'run': (('common', 'run'), "launch the application and wait until it is ready"),
+    'all': (tuple(OPTION_GROUPS), "diagnose, fix, install and run (the default)"),
+}
+
+
+def parse_args(argv=None):
+    """Parse the command line; without a subcommand every option is accepted and `all` runs"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Diagnose and fix common issues in Replit applications.")
+    defaults = {}
+    for group in OPTION_GROUPS.values():
+        for flags, options in group:
+            action = parser.add_argument(*flags, **options)
+            defaults[action.dest] = action.default
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    for command, (groups, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=help_text, description=help_text[0].upper() + help_text[1:] + ".")
+        for group in groups:
+            for flags, options in OPTION_GROUPS[group]:
+                # Suppressed defaults keep options given before the subcommand from being reset
+                subparser.add_argument(*flags, **dict(options, default=argparse.SUPPRESS))
+    
+    args = parser.parse_args(argv)
+    for dest, value in defaults.items():
+        if not hasattr(args, dest):
+            setattr(args, dest, value)
+    args.command = args.command or 'all'
+    if args.supervise and args.command != 'run':
+        parser.error("--supervise only applies to the run command")
+    if args.dry_run and args.command not in ('fix', 'all'):
+        parser.error("--dry-run only applies to the fix command")
+    return args
+
+
+def run_fleet(args):
+    """Diagnose every repository matched by --fleet and return the exit status"""
+    roots = expand_roots(args.fleet)
+    if not roots:
+        # A mistyped path or glob must not pass a nightly gate with nothing diagnosed
+        logger.error("No repositories to diagnose")
+        return 1
+    logger.info(f"🚚 Diagnosing {len(roots)} repositories...")
+    runner = FleetRunner(workers=args.fleet_workers, timeout=args.fleet_timeout,
+                         options={'use_cache': not args.no_cache, 'use_git_index': not args.no_git_index})
+    if args.fleet_output:
+        with open(args.fleet_output, 'w') as output:
+            summary = runner.run(roots, output)
+    else:
+        summary = runner.run(roots, sys.stdout)
+    logger.info(f"Diagnosed {summary['repositories']} repositories in {summary['total_seconds']:.1f}s of worker time: "
+                + ", ".join(f"{count} {status}" for status, count in sorted(summary['statuses'].items())))
+    return 0 if summary['statuses'].get('ok', 0) == summary['repositories'] else 1
+
+
+def run_subcommand(fixer, args):
+    """Run the phases of one subcommand and return whether it succeeded"""
+    command = args.command
+    if command == 'scan':
+        with fixer.metrics.phase('scan'):
+            fixer.scan_directory()
+        if not args.json:
+            # One path per line, so the list can be piped into other tools
+            try:
+                for category, paths in fixer.inventory().items():
+                    for path in paths:
+                        print(f"{category}\t{path}")
+                sys.stdout.flush()
+            except BrokenPipeError:
+                # The reader went away (e.g. `| head`); keep the exit flush from failing again
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return True
+    if command == 'check':
+        fixer.diagnose()
+        return not fixer.log_issues()
+    if command == 'fix':
+        fixer.diagnose()
+        if not fixer.log_issues():
+            return True
+        if args.dry_run:
+            with fixer.metrics.phase('fix'):
+                pending = fixer.fix_issues(dry_run=True)
+            if not args.json:
+                # With --json the diff goes into the report instead, so stdout stays parseable
+                sys.stdout.write(fixer.dry_run_diff)
+            return not pending
+        with fixer.metrics.phase('fix'):
+            fixed = fixer.fix_issues()
+        if not fixed:
+            logger.warning("⚠️ Couldn't apply automatic fixes. Manual intervention needed.")
+            return False
+        fixer.log_fixes()
+        return True
+    
+    with fixer.metrics.phase('scan'):
+        fixer.scan_directory()
+    with fixer.metrics.phase('detect'):
+        fixer.identify_framework()
+    if command == 'install':
+        with fixer.metrics.phase('install'):
+            fixer.install_dependencies()
+        return all(result['returncode'] == 0 for result in fixer.install_results or ())
+    with fixer.metrics.phase('run'):
+        if args.supervise:
+            return fixer.supervise_application(duration=args.duration, sample_interval=args.sample_interval,
+                                               max_backoff=args.max_backoff, crash_loop=args.crash_loop)
+        return fixer.run_application()
+
+
+def main(argv=None):
+    """Run the requested subcommand and return the process exit status"""
+    args = parse_args(argv)
+    if args.fleet:
+        return run_fleet(args)
+    
+    # The full pipeline keeps its banners; the subcommands are meant for scripts and CI
+    banners = args.command == 'all' and not (args.json or args.dry_run or args.watch)
+    if banners:
+        print("""
     ╭───────────────────────────────────────────╮
     │                                           │
     │        Replit Application Fixer           │
@@ -491,10 +3866,39 @@ if __name__ == "__main__":
     ╰───────────────────────────────────────────╯
     """)
     
-    fixer = ReplitFixer()
-    success = fixer.run_diagnostics()
+    metrics = PhaseRecorder(profile_path=args.profile) if args.json or args.profile else None
+    load_test = None
+    if args.load:
+        load_test = {
+            'paths': args.load_paths,
+            'concurrency': args.load_concurrency,
+            'duration': args.load_duration,
+            'max_error_rate': args.load_max_error_rate,
+            'max_p95': args.load_max_p95 / 1000 if args.load_max_p95 is not None else None,
+            'max_p99': args.load_max_p99 / 1000 if args.load_max_p99 is not None else None,
+            'min_throughput': args.load_min_throughput,
+        }
+    fixer = ReplitFixer(root=args.root, use_cache=not args.no_cache, jobs=args.jobs,
+                        install_concurrency=args.install_concurrency, install_timeout=args.install_timeout,
+                        ready_timeout=args.ready_timeout, health_path=args.health_path, metrics=metrics,
+                        use_git_index=not args.no_git_index, load_test=load_test, compress_jobs=args.compress_jobs,
+                        read_only=args.dry_run)
+    if args.watch:
+        fixer.watch(debounce=args.debounce / 1000, polling=args.poll)
+        return 0
+    if args.dry_run:
+        args.command = 'fix'
+    
+    if args.command == 'all':
+        success = fixer.run_diagnostics()
+    else:
+        success = run_subcommand(fixer, args)
+    if metrics is not None:
+        metrics.finish()
     
-    if success:
+    if args.json:
+        print(json.dumps(fixer.report(success), indent=2, default=str))
+    elif banners and success:
         print("""
         ╭───────────────────────────────────────────╮
         │                                           │
@@ -502,7 +3906,7 @@ if __name__ == "__main__":
         │                                           │
         ╰───────────────────────────────────────────╯
         """)
-    else:
+    elif banners:
         print("""
         ╭───────────────────────────────────────────────────────────────────────────────╮
         │                                                                               │
@@ -512,3 +3916,8 @@ if __name__ == "__main__":
         │                                                                               │
         ╰───────────────────────────────────────────────────────────────────────────────╯
         """)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import os
+import sys
+import json
+import subprocess
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'replit_fixer.py')
+
+
+def _repo(path, modules=80):
+    os.makedirs(path)
+    with open(os.path.join(path, '.replit'), 'w') as f:
+        f.write('run = ["python", "main.py"]\n')
+    with open(os.path.join(path, 'main.py'), 'w') as f:
+        f.write("from flask import Flask\n\napp = Flask(__name__)\napp.run(host='0.0.0.0', port=5000)\n")
+    # Enough files for -j to start a process pool in the worker
+    for i in range(modules):
+        with open(os.path.join(path, f"module_{i}.py"), 'w') as f:
+            f.write("import os\n")
+    assets = os.path.join(path, 'dist', 'assets')
+    os.makedirs(assets)
+    for name in ('index-Bg0y4OUR.js', 'vendor-3f2a9c1d.js'):
+        with open(os.path.join(assets, name), 'w') as f:
+            f.write("var a=function(){return 1};" * 2000)
+
+
+def test_fleet_with_parallel_jobs(tmp_path):
+    _repo(str(tmp_path / 'one'))
+    _repo(str(tmp_path / 'two'))
+    output = tmp_path / 'fleet.jsonl'
+
+    result = subprocess.run([sys.executable, SCRIPT, '-j', '2', 'check', '--fleet', str(tmp_path / '*'),
+                             '--fleet-output', str(output)], capture_output=True, text=True, timeout=120)
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    repos = [record for record in records if record['type'] == 'repo']
+    assert [record['status'] for record in repos] == ['ok', 'ok'], result.stderr
+    assert all(record['frameworks'] == ['flask'] for record in repos)
+    assert records[-1]['type'] == 'summary' and records[-1]['repositories'] == 2
+    assert result.returncode == 0
+
+
+def test_fleet_without_matches_fails(tmp_path):
+    result = subprocess.run([sys.executable, SCRIPT, 'check', '--fleet', str(tmp_path / 'nomatch*'), str(tmp_path / 'typo')],
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 1
+    assert "No directories match" in result.stderr and "Not a directory" in result.stderr